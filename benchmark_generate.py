@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""Throughput benchmark for the /generate path.
+
+Submits generation jobs to a running server, waits for them to finish and
+reports throughput and latency percentiles. For reproducible offline runs,
+start the server with the replay backend, e.g.
+
+    LLM_BACKEND=replay LLM_REPLAY_LATENCY=2 LLM_REPLAY_FAILURES=empty=0.05,error=0.05 \
+        ALLOW_CACHE_BYPASS=1 python app.py
+    python benchmark_generate.py --jobs 20 --concurrency 4 --quality low
+
+Record responses for replay first with LLM_BACKEND=record. Concepts are
+sent unchanged so their prompts match the recordings; jobs ask the server
+to skip the template, concept and render caches instead, which needs
+ALLOW_CACHE_BYPASS=1. Pass --use-caches to measure the cached path.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_CONCEPTS = [
+    'pythagorean theorem',
+    'derivative of x squared',
+    'unit circle and sine',
+    'solve x^2 - 5x + 6 = 0',
+    'matrix multiplication',
+    'area of a circle',
+]
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(int(round(p / 100 * len(ordered))) - 1, 0))]
+
+
+def run_job(base_url, concept, quality, render_mode, bypass_cache, timeout, poll_interval):
+    """Submit one job and poll it to completion; returns a result dict"""
+    start = time.monotonic()
+    response = requests.post(f'{base_url}/generate', json={
+        'concept': concept,
+        'quality': quality,
+        'render_mode': render_mode,
+        'bypass_cache': bypass_cache,
+    }, timeout=30)
+    if response.status_code == 429:
+        return {'status': 'rejected', 'latency': time.monotonic() - start}
+    if response.status_code == 403:
+        # The server does not allow bypass_cache
+        return {'status': 'forbidden', 'latency': time.monotonic() - start}
+    response.raise_for_status()
+    status_url = base_url + response.json()['status_url']
+
+    while time.monotonic() - start < timeout:
+        time.sleep(poll_interval)
+        data = requests.get(status_url, timeout=30).json()
+        if data['status'] in ('succeeded', 'failed'):
+            queued = (data['started_at'] or data['created_at']) - data['created_at']
+            return {'status': data['status'], 'latency': time.monotonic() - start, 'queue_wait': queued}
+    return {'status': 'timeout', 'latency': time.monotonic() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the /generate path of a running server')
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help='Server base URL')
+    parser.add_argument('--jobs', type=int, default=12, help='Number of jobs to submit')
+    parser.add_argument('--concurrency', type=int, default=4, help='Jobs in flight at once')
+    parser.add_argument('--quality', default='low', help='Render quality for every job')
+    parser.add_argument('--render-mode', default='standard', help='Render mode for every job')
+    parser.add_argument('--timeout', type=float, default=900, help='Seconds to wait for one job')
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--use-caches', action='store_true',
+                        help='Let the server answer from its template, concept and render caches')
+    args = parser.parse_args()
+
+    concepts = [DEFAULT_CONCEPTS[index % len(DEFAULT_CONCEPTS)] for index in range(args.jobs)]
+
+    print(f"Benchmarking {args.url}: {args.jobs} jobs, concurrency {args.concurrency}")
+    print("=" * 60)
+
+    results = []
+    lock = threading.Lock()
+
+    def worker(concept):
+        try:
+            result = run_job(args.url, concept, args.quality, args.render_mode,
+                             not args.use_caches, args.timeout, args.poll_interval)
+        except requests.RequestException as e:
+            result = {'status': 'error', 'latency': 0.0, 'detail': str(e)}
+        with lock:
+            results.append(result)
+            print(f"{len(results):3d}/{args.jobs} {result['status']:9s} {result['latency']:7.1f}s  {concept}")
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, concepts))
+    elapsed = time.monotonic() - start
+
+    succeeded = [r['latency'] for r in results if r['status'] == 'succeeded']
+    queue_waits = [r['queue_wait'] for r in results if 'queue_wait' in r]
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    print("=" * 60)
+    print(f"Wall time:   {elapsed:.1f}s")
+    print(f"Throughput:  {len(succeeded) / elapsed * 60:.2f} videos/min")
+    print(f"Outcomes:    {counts}")
+    if 'forbidden' in counts:
+        print("Start the server with ALLOW_CACHE_BYPASS=1 or pass --use-caches")
+    for p in (50, 90, 95, 99):
+        value = percentile(succeeded, p)
+        if value is not None:
+            print(f"Latency p{p}: {value:.1f}s")
+    if queue_waits:
+        print(f"Queue wait p50: {percentile(queue_waits, 50):.1f}s")
+
+    try:
+        metrics = requests.get(f'{args.url}/metrics', timeout=30).json()
+        print("\nStage p50 (s):")
+        for stage, stats in sorted(metrics.get('stages', {}).items()):
+            p50 = stats.get('percentiles', {}).get('p50')
+            if p50 is not None:
+                print(f"  {stage:20s} {p50:.3f}  (n={stats['count']})")
+        if 'llm_backend' in metrics:
+            print(f"\nLLM backend: {metrics['llm_backend']}")
+    except (requests.RequestException, ValueError) as e:
+        print(f"Could not read /metrics: {e}")
+
+    return 0 if succeeded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
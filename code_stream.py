@@ -0,0 +1,145 @@
+import re
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# SyntaxErrors that only mean the code is not finished yet
+INCOMPLETE_MARKERS = (
+    'was never closed',
+    'unexpected EOF',
+    'expected an indented block',
+    'unterminated triple-quoted string',
+    'EOF while scanning',
+)
+
+CODE_START = re.compile(r'^(from |import |class )', re.MULTILINE)
+
+
+class GenerationAborted(Exception):
+    """Raised when a streamed generation is clearly not going to produce usable code"""
+
+
+class StreamedResponse:
+    """Text and finish reason of a streamed generation.
+
+    Mimics the parts of a GenerateContentResponse that generate_manim_code()
+    inspects, so the retry loop can treat both the same way.
+    """
+
+    def __init__(self, text, finish_reason=None):
+        self.text = text
+        self.finish_reason = finish_reason
+
+    @property
+    def candidates(self):
+        return [self]
+
+
+class StreamingCodeExtractor:
+    """Find the code in a response as it streams in and check it as it grows.
+
+    feed() returns True once the closing fence has arrived, so the caller can
+    stop reading, and raises GenerationAborted when the output goes wrong:
+    prose with no code, a syntax error in completed lines, or a line repeated
+    over and over.
+    """
+
+    def __init__(self, check_every=10, max_preamble_chars=1500, max_repeated_lines=12):
+        self.check_every = check_every
+        self.max_preamble_chars = max_preamble_chars
+        self.max_repeated_lines = max_repeated_lines
+        self.buffer = ''
+        self.code_start = None
+        self.code_end = None
+        self.checked_lines = 0
+
+    @property
+    def text(self):
+        """Everything received, cut after the closing fence if there was one"""
+        if self.code_end is not None:
+            return self.buffer[:self.code_end + 3]
+        return self.buffer
+
+    @property
+    def code(self):
+        if self.code_start is None:
+            return ''
+        end = self.code_end if self.code_end is not None else len(self.buffer)
+        return self.buffer[self.code_start:end]
+
+    def feed(self, chunk):
+        if self.code_end is not None:
+            return True
+        self.buffer += chunk
+
+        if self.code_start is None:
+            self._find_code_start()
+            if self.code_start is None:
+                if len(self.buffer) > self.max_preamble_chars:
+                    raise GenerationAborted(f'No code after {len(self.buffer)} characters')
+                return False
+
+        end = self.buffer.find('\n```', max(self.code_start - 1, 0))
+        if end != -1:
+            self.code_end = end + 1
+            self._check(final=True)
+            return True
+
+        self._check()
+        return False
+
+    def _find_code_start(self):
+        fence = self.buffer.find('```')
+        if fence != -1:
+            # Code starts on the line after the opening fence
+            newline = self.buffer.find('\n', fence)
+            if newline != -1:
+                self.code_start = newline + 1
+            return
+        match = CODE_START.search(self.buffer)
+        if match:
+            # Unfenced answer; there is no closing fence to wait for
+            self.code_start = match.start()
+
+    def _check(self, final=False):
+        code = self.code
+        lines = code.split('\n')
+        if not final:
+            # The last line may still be arriving
+            lines = lines[:-1]
+        if len(lines) - self.checked_lines < self.check_every and not final:
+            return
+        self.checked_lines = len(lines)
+
+        self._check_repetition(lines)
+        if final:
+            # Complete code is validated again by the caller
+            return
+
+        try:
+            compile('\n'.join(lines), '<stream>', 'exec')
+        except SyntaxError as e:
+            message = str(e)
+            if e.lineno is None:
+                return
+            if any(marker in message for marker in INCOMPLETE_MARKERS):
+                return
+            if e.lineno >= len(lines):
+                # The statement on the last complete line may continue
+                return
+            logger.info(f"Aborting generation at line {len(lines)}: {message}")
+            raise GenerationAborted(f'Syntax error in generated code: {message}')
+
+    def _check_repetition(self, lines):
+        repeated = 1
+        previous = None
+        for line in lines:
+            stripped = line.strip()
+            if stripped and stripped == previous:
+                repeated += 1
+                if repeated >= self.max_repeated_lines:
+                    raise GenerationAborted(f'Line repeated {repeated} times: {stripped[:60]}')
+            else:
+                repeated = 1
+            previous = stripped if stripped else previous
@@ -0,0 +1,362 @@
+import ast
+import inspect
+import difflib
+import textwrap
+import logging
+import builtins
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# ManimGL / pre-community names that have a drop-in Manim Community replacement
+KNOWN_RENAMES = {
+    'ShowCreation': 'Create',
+    'TextMobject': 'Text',
+    'TexMobject': 'MathTex',
+}
+
+BUILTIN_NAMES = set(dir(builtins)) | {'__name__', '__file__'}
+
+
+class SymbolInfo:
+    """What the validator knows about a callable or class exported by manim"""
+
+    def __init__(self, params=None, var_keyword=True, cls=None, dynamic=False):
+        self.params = params or set()
+        # True when unknown keyword arguments are accepted
+        self.var_keyword = var_keyword
+        self.cls = cls
+        # True for classes with __getattr__, e.g. Mobject's generated get_*/set_*
+        self.dynamic = dynamic
+        self._attributes = None
+
+    @property
+    def attributes(self):
+        """Class attributes plus instance attributes assigned in any __init__ source, or None"""
+        if self.cls is None:
+            return None
+        if self._attributes is None:
+            self._attributes = set(dir(self.cls)) | _instance_attributes(self.cls)
+        return self._attributes
+
+
+def _instance_attributes(cls):
+    """Names assigned to self.<name> anywhere in the source of cls and its bases"""
+    names = set()
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        try:
+            tree = ast.parse(textwrap.dedent(inspect.getsource(klass)))
+        except (OSError, TypeError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load) and
+                    isinstance(node.value, ast.Name) and node.value.id == 'self'):
+                names.add(node.attr)
+    return names
+
+
+def _signature_params(function):
+    """Named parameters of a callable and whether it takes **kwargs"""
+    try:
+        signature = inspect.signature(function)
+    except (TypeError, ValueError):
+        return None, True
+    params = {
+        name for name, param in signature.parameters.items()
+        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+    }
+    var_keyword = any(param.kind == param.VAR_KEYWORD for param in signature.parameters.values())
+    return params - {'self'}, var_keyword
+
+
+def _class_info(cls):
+    # Keyword arguments usually flow up the MRO through **kwargs, so collect
+    # parameters until an __init__ stops forwarding them
+    params = set()
+    var_keyword = True
+    for klass in cls.__mro__:
+        if klass is object:
+            break
+        init = klass.__dict__.get('__init__')
+        if init is None:
+            continue
+        init_params, forwards = _signature_params(init)
+        if init_params is None:
+            break
+        params |= init_params
+        if not forwards:
+            var_keyword = False
+            break
+
+    dynamic = any('__getattr__' in klass.__dict__ for klass in cls.__mro__ if klass is not object)
+    return SymbolInfo(params, var_keyword, cls, dynamic)
+
+
+class SymbolIndex:
+    """Names exported by `from manim import *` with signatures and class attributes"""
+
+    def __init__(self, namespace):
+        self.names = {name for name in namespace if not name.startswith('_')}
+        self.symbols = {}
+        for name in self.names:
+            value = namespace[name]
+            if inspect.isclass(value):
+                self.symbols[name] = _class_info(value)
+            elif callable(value):
+                params, var_keyword = _signature_params(value)
+                if params is not None:
+                    self.symbols[name] = SymbolInfo(params, var_keyword)
+        self.lowercase = {}
+        for name in self.names:
+            self.lowercase.setdefault(name.lower(), []).append(name)
+
+    @classmethod
+    def from_manim(cls):
+        """Index the installed manim package"""
+        import manim
+        namespace = {name: getattr(manim, name) for name in dir(manim)}
+        index = cls(namespace)
+        logger.info(f"Indexed {len(index.names)} manim symbols")
+        return index
+
+
+class Issue:
+    """A problem found in the generated code"""
+
+    def __init__(self, kind, message, lineno, col, end_col=None, name=None, replacement=None):
+        self.kind = kind
+        self.message = message
+        self.lineno = lineno
+        self.col = col
+        self.end_col = end_col
+        self.name = name
+        self.replacement = replacement
+
+    def __str__(self):
+        return f'line {self.lineno}: {self.message}'
+
+
+class ValidationResult:
+    """Validated (and possibly repaired) code plus whatever could not be fixed"""
+
+    def __init__(self, code, issues, repairs):
+        self.code = code
+        self.issues = issues
+        self.repairs = repairs
+
+    @property
+    def ok(self):
+        return not self.issues
+
+
+class CodeValidator:
+    """Resolve names, constructor keywords and attribute access against a SymbolIndex.
+
+    Only confident fixes (known renames, case-only differences and close
+    spelling matches) are applied; everything else is reported.
+    """
+
+    def __init__(self, index, cutoff=0.85):
+        self.index = index
+        self.cutoff = cutoff
+
+    def validate(self, code):
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return ValidationResult(code, [Issue('syntax', str(e), e.lineno or 0, e.offset or 0)], [])
+
+        issues = self._find_issues(tree)
+        fixes = [issue for issue in issues if issue.replacement]
+        if not fixes:
+            return ValidationResult(code, issues, [])
+
+        repaired = self._apply(code, fixes)
+        repairs = [f'line {fix.lineno}: {fix.name} -> {fix.replacement}' for fix in fixes]
+        try:
+            remaining = [issue for issue in self._find_issues(ast.parse(repaired)) if not issue.replacement]
+        except SyntaxError:
+            # A repair should never break parsing, but never hand back worse code
+            return ValidationResult(code, issues, [])
+        return ValidationResult(repaired, remaining, repairs)
+
+    def _find_issues(self, tree):
+        bound, star_imports = self._bound_names(tree)
+        issues = []
+        if not star_imports:
+            issues += self._check_names(tree, bound)
+        issues += self._check_calls(tree, bound)
+        issues += self._check_attributes(tree)
+        return issues
+
+    def _bound_names(self, tree):
+        """Every name the module could define anywhere, ignoring flow"""
+        bound = set(BUILTIN_NAMES)
+        star_imports = False
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == '*':
+                        if node.module == 'manim':
+                            bound |= self.index.names
+                        else:
+                            star_imports = True
+                    else:
+                        bound.add(alias.asname or alias.name)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    bound.add(alias.asname or alias.name.split('.')[0])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                bound.add(node.name)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)
+            elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+                bound.add(node.id)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                bound.add(node.name)
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                bound.update(node.names)
+        return bound, star_imports
+
+    def _suggest(self, name, candidates):
+        if name in KNOWN_RENAMES and KNOWN_RENAMES[name] in candidates:
+            return KNOWN_RENAMES[name]
+        same_case = [candidate for candidate in self.index.lowercase.get(name.lower(), []) if candidate in candidates]
+        if len(same_case) == 1:
+            return same_case[0]
+        matches = difflib.get_close_matches(name, candidates, n=2, cutoff=self.cutoff)
+        if len(matches) == 1 or (len(matches) == 2 and
+                                 difflib.SequenceMatcher(None, name, matches[0]).ratio() >
+                                 difflib.SequenceMatcher(None, name, matches[1]).ratio()):
+            return matches[0]
+        return None
+
+    def _check_names(self, tree, bound):
+        issues = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in bound:
+                replacement = self._suggest(node.id, bound)
+                issues.append(Issue(
+                    'undefined-name', f"name '{node.id}' is not defined",
+                    node.lineno, node.col_offset, node.end_col_offset, node.id, replacement
+                ))
+        return issues
+
+    def _check_calls(self, tree, bound):
+        issues = []
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)):
+                continue
+            info = self.index.symbols.get(node.func.id)
+            if info is None or info.var_keyword:
+                continue
+            for keyword in node.keywords:
+                if keyword.arg is None or keyword.arg in info.params:
+                    continue
+                replacement = self._suggest(keyword.arg, info.params)
+                issues.append(Issue(
+                    'unknown-keyword', f"{node.func.id}() got an unexpected keyword argument '{keyword.arg}'",
+                    keyword.lineno, keyword.col_offset, keyword.col_offset + len(keyword.arg.encode('utf-8')),
+                    keyword.arg, replacement
+                ))
+        return issues
+
+    def _check_attributes(self, tree):
+        issues = []
+        for scope in ast.walk(tree):
+            if isinstance(scope, ast.ClassDef):
+                issues += self._check_class(scope)
+            elif isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                issues += self._check_locals(scope)
+        return issues
+
+    def _check_class(self, class_node):
+        """Check self.<attr> in methods of classes deriving from manim classes like Scene"""
+        allowed = set()
+        for base in class_node.bases:
+            if not isinstance(base, ast.Name):
+                return []
+            info = self.index.symbols.get(base.id)
+            if info is None or info.attributes is None or info.dynamic:
+                return []
+            allowed |= info.attributes
+
+        for node in class_node.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                allowed.add(node.name)
+            elif isinstance(node, ast.Assign):
+                allowed |= {target.id for target in node.targets if isinstance(target, ast.Name)}
+        for node in ast.walk(class_node):
+            if isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load):
+                if isinstance(node.value, ast.Name) and node.value.id == 'self':
+                    allowed.add(node.attr)
+
+        issues = []
+        for method in class_node.body:
+            if not isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef)) or not method.args.args:
+                continue
+            receiver = method.args.args[0].arg
+            issues += self._check_access(method, {receiver: (class_node.name, allowed)})
+        return issues
+
+    def _check_locals(self, function):
+        """Check attribute access on locals assigned exactly once from a manim class"""
+        assigned = {}
+        for node in ast.walk(function):
+            if not isinstance(node, ast.Assign):
+                continue
+            for target in node.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                value = node.value
+                kind = None
+                if isinstance(value, ast.Call) and isinstance(value.func, ast.Name):
+                    info = self.index.symbols.get(value.func.id)
+                    if info is not None and info.attributes is not None and not info.dynamic:
+                        kind = value.func.id
+                assigned.setdefault(target.id, []).append(kind)
+
+        receivers = {}
+        for name, kinds in assigned.items():
+            if len(kinds) == 1 and kinds[0]:
+                attributes = set(self.index.symbols[kinds[0]].attributes)
+                for node in ast.walk(function):
+                    if (isinstance(node, ast.Attribute) and not isinstance(node.ctx, ast.Load) and
+                            isinstance(node.value, ast.Name) and node.value.id == name):
+                        attributes.add(node.attr)
+                receivers[name] = (kinds[0], attributes)
+        return self._check_access(function, receivers) if receivers else []
+
+    def _check_access(self, function, receivers):
+        issues = []
+        for node in ast.walk(function):
+            if not (isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load) and
+                    isinstance(node.value, ast.Name) and node.value.id in receivers):
+                continue
+            owner, allowed = receivers[node.value.id]
+            if node.attr in allowed:
+                continue
+            replacement = self._suggest(node.attr, allowed)
+            issues.append(Issue(
+                'unknown-attribute', f"'{owner}' object has no attribute '{node.attr}'",
+                node.end_lineno, node.end_col_offset - len(node.attr.encode('utf-8')), node.end_col_offset,
+                node.attr, replacement
+            ))
+        return issues
+
+    def _apply(self, code, fixes):
+        """Rewrite identifiers in place; AST columns are UTF-8 byte offsets"""
+        lines = code.split('\n')
+        by_line = {}
+        for fix in fixes:
+            by_line.setdefault(fix.lineno, []).append(fix)
+        for lineno, line_fixes in by_line.items():
+            data = lines[lineno - 1].encode('utf-8')
+            for fix in sorted(line_fixes, key=lambda fix: fix.col, reverse=True):
+                if data[fix.col:fix.end_col] != fix.name.encode('utf-8'):
+                    continue
+                data = data[:fix.col] + fix.replacement.encode('utf-8') + data[fix.end_col:]
+            lines[lineno - 1] = data.decode('utf-8')
+        return '\n'.join(lines)
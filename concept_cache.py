@@ -0,0 +1,137 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Filler words that do not change which animation a concept should produce
+STOPWORDS = {
+    'a', 'an', 'the', 'of', 'to', 'for', 'and', 'in', 'on', 'me', 'please',
+    'explain', 'show', 'visualize', 'visualise', 'animate', 'animation',
+    'video', 'what', 'is', 'are', 'how', 'does', 'do', 'about', 'can', 'you',
+}
+
+
+def normalize_concept(text):
+    """Reduce a sanitized concept to a canonical lookup form"""
+    text = text.lower()
+    # Keep math symbols, drop other punctuation
+    text = re.sub(r"[^\w\s\^\+\-\*/=()<>.]", ' ', text)
+    text = re.sub(r'\.(?!\d)', ' ', text)
+    words = [word for word in text.split() if word not in STOPWORDS]
+    return ' '.join(words)
+
+
+class ConceptCache:
+    """Persistent cache of generated Manim code that rendered successfully"""
+
+    def __init__(self, db_path, ttl=7 * 24 * 3600, max_entries=1000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS concepts (
+                    key TEXT PRIMARY KEY,
+                    concept TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )'''
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def key(self, concept):
+        normalized = normalize_concept(concept)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def get(self, concept):
+        """Return cached code for a concept, or None if absent or expired"""
+        key = self.key(concept)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT code, created_at FROM concepts WHERE key = ?', (key,)
+                ).fetchone()
+                if row and row[1] < now - self.ttl:
+                    conn.execute('DELETE FROM concepts WHERE key = ?', (key,))
+                    row = None
+                if row:
+                    conn.execute(
+                        'UPDATE concepts SET last_used = ?, hits = hits + 1 WHERE key = ?',
+                        (now, key)
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Concept cache lookup failed: {str(e)}")
+            row = None
+
+        with self.lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if row:
+            logger.info(f"Concept cache hit for: {concept}")
+            return row[0]
+        return None
+
+    def put(self, concept, code):
+        """Remember code that rendered cleanly for a concept"""
+        key = self.key(concept)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    '''INSERT OR REPLACE INTO concepts
+                       (key, concept, code, created_at, last_used, hits)
+                       VALUES (?, ?, ?, ?, ?, 0)''',
+                    (key, concept, code, now, now)
+                )
+                # Drop expired entries, then the least recently used overflow
+                conn.execute('DELETE FROM concepts WHERE created_at < ?', (now - self.ttl,))
+                conn.execute(
+                    '''DELETE FROM concepts WHERE key NOT IN (
+                        SELECT key FROM concepts ORDER BY last_used DESC LIMIT ?
+                    )''',
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Concept cache store failed: {str(e)}")
+
+    def stats(self):
+        """Hit/miss counters and current entry count"""
+        try:
+            with self._connect() as conn:
+                entries = conn.execute('SELECT COUNT(*) FROM concepts').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+        }
@@ -0,0 +1,412 @@
+import os
+import re
+import mmap
+import math
+import heapq
+import struct
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Sections in manim_docs.txt are fenced by a line of 80 '=' characters
+SECTION_SEPARATOR = '=' * 80
+
+# Words too common in the docs to help ranking
+STOPWORDS = {
+    'a', 'an', 'the', 'of', 'to', 'for', 'and', 'in', 'on', 'is', 'are', 'be',
+    'it', 'this', 'that', 'with', 'as', 'by', 'or', 'from', 'at', 'can', 'if',
+    'self', 'import', 'explain', 'show', 'visualize', 'how', 'what',
+}
+
+# Rough size of a token for prompt budgeting
+CHARS_PER_TOKEN = 4
+
+# On-disk index layout, all little-endian:
+#   header, passage table, term table (sorted by term), postings, strings
+INDEX_MAGIC = b'MDIX'
+INDEX_VERSION = 1
+# magic, version, docs sha256, passages, terms, average length, k1, b,
+# offsets of the passage table, term table, postings and strings sections
+HEADER = struct.Struct('<4sI32sIIddd4Q')
+# text offset, text length, source offset, source length, length norm
+PASSAGE_ENTRY = struct.Struct('<QIQId')
+# term offset, term length, first posting, document frequency, idf
+TERM_ENTRY = struct.Struct('<QIQId')
+# passage id, term frequency
+POSTING = struct.Struct('<II')
+
+
+class IndexFormatError(Exception):
+    """Raised when an index file is missing, corrupt, outdated or stale"""
+
+
+def tokenize(text):
+    """Lowercase word tokens, splitting CamelCase names like MathTex into parts too"""
+    words = re.findall(r'[A-Za-z_][A-Za-z0-9_]*|\d+', text)
+    tokens = []
+    for word in words:
+        lower = word.lower()
+        if lower in STOPWORDS:
+            continue
+        tokens.append(lower)
+        parts = re.findall(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+', word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts if part.lower() not in STOPWORDS)
+    return tokens
+
+
+class Passage:
+    """A chunk of documentation and where it came from"""
+
+    def __init__(self, text, source):
+        self.text = text
+        self.source = source
+
+
+class SearchableIndex:
+    """BM25 ranking shared by the in-memory and memory-mapped indexes.
+
+    Subclasses provide _term(term) -> (idf, postings) or None, _norm(doc_id)
+    and _passage(doc_id).
+    """
+
+    k1 = 1.5
+
+    def search(self, query, top_k=5):
+        """Return up to top_k (score, passage) pairs, best first"""
+        scores = {}
+        for term in set(tokenize(query)):
+            entry = self._term(term)
+            if entry is None:
+                continue
+            idf, postings = entry
+            for doc_id, frequency in postings:
+                score = idf * frequency * (self.k1 + 1) / (frequency + self._norm(doc_id))
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(score, self._passage(doc_id)) for doc_id, score in best]
+
+    def context(self, query, top_k=5, max_tokens=750):
+        """Concatenate the best passages for query without exceeding max_tokens"""
+        budget = max_tokens * CHARS_PER_TOKEN
+        parts = []
+        for _, passage in self.search(query, top_k):
+            text = f'[{passage.source}]\n{passage.text}'
+            if len(text) > budget:
+                if not parts:
+                    parts.append(text[:budget])
+                    break
+                continue
+            parts.append(text)
+            budget -= len(text) + 2
+        return '\n\n'.join(parts)
+
+    def close(self):
+        """Release resources held by the index; nothing to do in memory"""
+
+
+class DocsIndex(SearchableIndex):
+    """BM25-ranked inverted index over chunked documentation passages.
+
+    Built once from the docs text; searches only touch the postings of the
+    query terms. write() saves it in the format MappedDocsIndex reads.
+    """
+
+    def __init__(self, text, chunk_chars=800, k1=1.5, b=0.75):
+        self.chunk_chars = chunk_chars
+        self.k1 = k1
+        self.b = b
+        self.passages = []
+        self.doc_lengths = []
+        self.postings = {}
+        self.idf = {}
+        self.norms = []
+        self.average_length = 0
+
+        for source, body in self._sections(text):
+            for chunk in self._chunk(body):
+                self._add(Passage(chunk, source))
+
+        count = len(self.passages)
+        for term, postings in self.postings.items():
+            frequency = len(postings)
+            self.idf[term] = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+        if count:
+            self.average_length = sum(self.doc_lengths) / count
+            # Length normalisation is per passage, so compute it once
+            self.norms = [
+                k1 * (1 - b + b * length / self.average_length) for length in self.doc_lengths
+            ]
+        logger.info(f"Indexed {count} documentation passages, {len(self.postings)} terms")
+
+    def _sections(self, text):
+        """Yield (source, body) per section, without the navigation repeated on every page"""
+        sections = []
+        for raw in text.split(SECTION_SEPARATOR):
+            match = re.search(r'^SOURCE:\s*(\S+)', raw, re.MULTILINE)
+            if match:
+                # The source line closes the previous chunk; its body follows in the next one
+                sections.append([match.group(1), ''])
+            elif sections:
+                sections[-1][1] += raw
+            elif raw.strip():
+                sections.append(['manim_docs.txt', raw])
+
+        # Lines present on most pages are site navigation, not documentation
+        line_counts = Counter()
+        for _, body in sections:
+            line_counts.update({line.strip() for line in body.splitlines() if line.strip()})
+        boilerplate = {line for line, seen in line_counts.items() if seen > 1 and seen >= len(sections) / 2}
+
+        for source, body in sections:
+            lines = [line for line in body.splitlines() if line.strip() and line.strip() not in boilerplate]
+            yield source, '\n'.join(lines)
+
+    def _chunk(self, body):
+        """Group consecutive lines into passages of about chunk_chars"""
+        chunk = []
+        size = 0
+        for line in body.splitlines():
+            if size + len(line) > self.chunk_chars and chunk:
+                yield '\n'.join(chunk)
+                chunk = []
+                size = 0
+            chunk.append(line[:self.chunk_chars])
+            size += len(line) + 1
+        if chunk:
+            yield '\n'.join(chunk)
+
+    def _add(self, passage):
+        doc_id = len(self.passages)
+        terms = Counter(tokenize(passage.text))
+        self.passages.append(passage)
+        self.doc_lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, []).append((doc_id, frequency))
+
+    def _term(self, term):
+        idf = self.idf.get(term)
+        return None if idf is None else (idf, self.postings[term])
+
+    def _norm(self, doc_id):
+        return self.norms[doc_id]
+
+    def _passage(self, doc_id):
+        return self.passages[doc_id]
+
+    def stats(self):
+        return {
+            'passages': len(self.passages),
+            'terms': len(self.postings),
+            'average_length': round(self.average_length, 1),
+            'mapped': False,
+        }
+
+    def write(self, path, digest):
+        """Atomically save the index; digest is the sha256 of the docs it was built from"""
+        strings = bytearray()
+
+        def add_string(text):
+            data = text.encode('utf-8')
+            offset = len(strings)
+            strings.extend(data)
+            return offset, len(data)
+
+        passage_table = bytearray()
+        source_refs = {}
+        for passage, norm in zip(self.passages, self.norms):
+            if passage.source not in source_refs:
+                source_refs[passage.source] = add_string(passage.source)
+            text_offset, text_length = add_string(passage.text)
+            source_offset, source_length = source_refs[passage.source]
+            passage_table += PASSAGE_ENTRY.pack(text_offset, text_length, source_offset, source_length, norm)
+
+        term_table = bytearray()
+        postings = bytearray()
+        posting_count = 0
+        # Sorted by encoded bytes so readers can binary search the mapped table
+        for term in sorted(self.postings, key=lambda term: term.encode('utf-8')):
+            term_offset, term_length = add_string(term)
+            entries = self.postings[term]
+            term_table += TERM_ENTRY.pack(term_offset, term_length, posting_count, len(entries), self.idf[term])
+            for doc_id, frequency in entries:
+                postings += POSTING.pack(doc_id, frequency)
+            posting_count += len(entries)
+
+        passage_start = HEADER.size
+        term_start = passage_start + len(passage_table)
+        postings_start = term_start + len(term_table)
+        strings_start = postings_start + len(postings)
+        header = HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, digest,
+            len(self.passages), len(self.postings),
+            self.average_length, self.k1, self.b,
+            passage_start, term_start, postings_start, strings_start
+        )
+
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            for section in (header, passage_table, term_table, postings, strings):
+                f.write(section)
+        os.replace(temp_path, path)
+        logger.info(f"Wrote documentation index to {path}")
+
+
+class MappedDocsIndex(SearchableIndex):
+    """Read-only view of an index file written by DocsIndex.write().
+
+    The file is memory-mapped, so every worker process shares one copy in the
+    page cache and opening it does no parsing beyond the fixed-size header.
+    """
+
+    def __init__(self, path, digest=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise IndexFormatError(f'{path} is empty')
+
+        if len(self.buffer) < HEADER.size:
+            self.close()
+            raise IndexFormatError(f'{path} is truncated')
+        (magic, version, index_digest, self.passage_count, self.term_count,
+         self.average_length, self.k1, self.b, self.passage_start, self.term_start,
+         self.postings_start, self.strings_start) = HEADER.unpack_from(self.buffer, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise IndexFormatError(f'{path} is not a version {INDEX_VERSION} docs index')
+        if digest is not None and index_digest != digest:
+            self.close()
+            raise IndexFormatError(f'{path} was built from different documentation')
+
+    def _string(self, offset, length):
+        start = self.strings_start + offset
+        return self.buffer[start:start + length]
+
+    def _term(self, term):
+        key = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            term_offset, term_length, first, frequency, idf = TERM_ENTRY.unpack_from(
+                self.buffer, self.term_start + middle * TERM_ENTRY.size
+            )
+            found = self._string(term_offset, term_length)
+            if found == key:
+                start = self.postings_start + first * POSTING.size
+                return idf, POSTING.iter_unpack(self.buffer[start:start + frequency * POSTING.size])
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _norm(self, doc_id):
+        return PASSAGE_ENTRY.unpack_from(self.buffer, self.passage_start + doc_id * PASSAGE_ENTRY.size)[4]
+
+    def _passage(self, doc_id):
+        text_offset, text_length, source_offset, source_length, _ = PASSAGE_ENTRY.unpack_from(
+            self.buffer, self.passage_start + doc_id * PASSAGE_ENTRY.size
+        )
+        return Passage(
+            self._string(text_offset, text_length).decode('utf-8'),
+            self._string(source_offset, source_length).decode('utf-8')
+        )
+
+    def stats(self):
+        return {
+            'passages': self.passage_count,
+            'terms': self.term_count,
+            'average_length': round(self.average_length, 1),
+            'mapped': True,
+            'bytes': len(self.buffer),
+        }
+
+    def close(self):
+        self.buffer.close()
+
+
+class SharedIndex:
+    """The current docs index for concurrent searches, swappable at runtime.
+
+    A replaced index is closed once the last search using it finishes, so
+    refreshing the docs does not leak its mapping or cut off a search.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.users = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def use(self):
+        """Yield the current index, kept open for the with-block"""
+        with self.lock:
+            index = self.index
+            self.users[id(index)] = self.users.get(id(index), 0) + 1
+        try:
+            yield index
+        finally:
+            with self.lock:
+                remaining = self.users[id(index)] - 1
+                if remaining:
+                    self.users[id(index)] = remaining
+                else:
+                    del self.users[id(index)]
+                retired = not remaining and index is not self.index
+            if retired:
+                index.close()
+
+    def stats(self):
+        with self.use() as index:
+            return index.stats()
+
+    def replace(self, index):
+        """Make index current and close the old one when it is no longer in use"""
+        with self.lock:
+            old_index = self.index
+            self.index = index
+            in_use = id(old_index) in self.users
+        if not in_use and old_index is not index:
+            old_index.close()
+
+
+def docs_digest(docs_path):
+    """sha256 of the docs file, recorded in the index to detect stale builds"""
+    with open(docs_path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def build_index_file(docs_path, index_path):
+    """Index docs_path and write it to index_path"""
+    with open(docs_path, 'rb') as f:
+        data = f.read()
+    # Hash the raw bytes so the digest matches docs_digest() exactly
+    text = data.decode('utf-8').replace('\r\n', '\n')
+    DocsIndex(text).write(index_path, hashlib.sha256(data).digest())
+
+
+def open_docs_index(docs_path, index_path):
+    """Map the index for docs_path, rebuilding it first if it is missing or stale.
+
+    Falls back to an in-memory index if the index file cannot be written.
+    """
+    digest = docs_digest(docs_path)
+    try:
+        return MappedDocsIndex(index_path, digest)
+    except (OSError, IndexFormatError) as e:
+        logger.info(f"Rebuilding documentation index: {str(e)}")
+
+    try:
+        build_index_file(docs_path, index_path)
+        return MappedDocsIndex(index_path, digest)
+    except (OSError, IndexFormatError) as e:
+        logger.warning(f"Could not write documentation index, keeping it in memory: {str(e)}")
+        with open(docs_path, 'r', encoding='utf-8') as f:
+            return DocsIndex(f.read())
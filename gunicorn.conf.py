@@ -0,0 +1,12 @@
+import os
+
+# Generation jobs are tracked in process memory, so use one worker with threads
+workers = 1
+worker_class = 'gthread'
+timeout = 300
+
+# Every admitted job may hold a thread with its /jobs/<id>/events stream, so
+# size the thread pool from the job queue limits and keep headroom for
+# /generate, status polling and video requests
+job_slots = int(os.getenv('GENERATION_WORKERS', 2)) + int(os.getenv('GENERATION_QUEUE_SIZE', 20))
+threads = int(os.getenv('GUNICORN_THREADS', 0)) or job_slots + 8
@@ -0,0 +1,186 @@
+import os
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from render_cache import KeyLocks
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MASTER_PLAYLIST = 'master.m3u8'
+RENDITION_PLAYLIST = 'index.m3u8'
+
+# Source height of each render quality; renditions above it are skipped
+QUALITY_HEIGHTS = {
+    'low': 480,
+    'medium': 720,
+    'high': 1080,
+}
+
+
+class Rendition:
+    """One rung of the ladder: output height and target video bitrate"""
+
+    def __init__(self, height, kbps):
+        self.height = height
+        self.kbps = kbps
+
+    @property
+    def name(self):
+        return f'{self.height}p'
+
+    @property
+    def width(self):
+        # Manim renders 16:9; x264 needs even dimensions
+        return int(round(self.height * 16 / 9 / 2)) * 2
+
+
+def parse_renditions(spec):
+    """Parse '720:2800,480:1400' (height:kbps) into renditions, highest first"""
+    renditions = []
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        height, _, kbps = item.partition(':')
+        renditions.append(Rendition(int(height), int(kbps)))
+    return sorted(renditions, key=lambda rendition: rendition.height, reverse=True)
+
+
+def transcode_rendition(source_file, output_dir, rendition, segment_seconds=4, timeout=600):
+    """Encode one rendition as VOD HLS with keyframes on segment boundaries"""
+    os.makedirs(output_dir, exist_ok=True)
+    command = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-i', source_file,
+        '-map', '0:v:0', '-map', '0:a?',
+        '-vf', f'scale=-2:{rendition.height}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+        '-b:v', f'{rendition.kbps}k',
+        '-maxrate', f'{int(rendition.kbps * 1.07)}k',
+        '-bufsize', f'{int(rendition.kbps * 1.5)}k',
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})',
+        '-sc_threshold', '0',
+        '-c:a', 'aac', '-b:a', '96k',
+        '-f', 'hls',
+        '-hls_time', str(segment_seconds),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', os.path.join(output_dir, 'segment_%04d.ts'),
+        os.path.join(output_dir, RENDITION_PLAYLIST),
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f'ffmpeg HLS transcode to {rendition.name} failed: {result.stderr}')
+
+
+def write_master_playlist(output_dir, renditions):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for rendition in renditions:
+        # Advertised bandwidth covers the video peak plus audio
+        bandwidth = int(rendition.kbps * 1.07 + 96) * 1000
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={rendition.width}x{rendition.height}')
+        lines.append(f'{rendition.name}/{RENDITION_PLAYLIST}')
+    with open(os.path.join(output_dir, MASTER_PLAYLIST), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+class HlsLadder:
+    """Builds and keeps HLS rendition ladders next to the videos they come from.
+
+    A ladder for static/videos/<name>.mp4 lives in <hls_dir>/<name>/ and is
+    built once. All renditions are transcoded in parallel into a temporary
+    directory that is renamed into place when complete.
+    """
+
+    def __init__(self, hls_dir, renditions, segment_seconds=4, timeout=600):
+        self.hls_dir = hls_dir
+        self.renditions = renditions
+        self.segment_seconds = segment_seconds
+        self.timeout = timeout
+        self.key_locks = KeyLocks()
+        os.makedirs(hls_dir, exist_ok=True)
+
+    def ladder_dir(self, video_file):
+        return os.path.join(self.hls_dir, os.path.splitext(os.path.basename(video_file))[0])
+
+    def renditions_for(self, quality):
+        """Renditions no taller than the source, or just the smallest if none fit"""
+        source_height = QUALITY_HEIGHTS.get(quality)
+        fitting = [r for r in self.renditions if source_height is None or r.height <= source_height]
+        return fitting or self.renditions[-1:]
+
+    def exists(self, video_file):
+        return os.path.exists(os.path.join(self.ladder_dir(video_file), MASTER_PLAYLIST))
+
+    def size(self, video_file):
+        """Bytes of the ladder built from a video, 0 if there is none"""
+        total = 0
+        for root, _, files in os.walk(self.ladder_dir(video_file)):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+    def remove(self, video_file):
+        """Delete the ladder built from a video; a ladder being built is left to prune()"""
+        ladder_dir = self.ladder_dir(video_file)
+        with self.key_locks.hold(ladder_dir, blocking=False) as held:
+            if held:
+                shutil.rmtree(ladder_dir, ignore_errors=True)
+
+    def build(self, video_file, quality):
+        """Return the master playlist path for a video, transcoding it if needed"""
+        ladder_dir = self.ladder_dir(video_file)
+        master = os.path.join(ladder_dir, MASTER_PLAYLIST)
+        with self.key_locks.hold(ladder_dir):
+            if os.path.exists(master):
+                return master
+
+            renditions = self.renditions_for(quality)
+            temp_dir = f'{ladder_dir}.{os.getpid()}.{threading.get_ident()}.tmp'
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            try:
+                with ThreadPoolExecutor(max_workers=len(renditions)) as executor:
+                    futures = [
+                        executor.submit(transcode_rendition, video_file,
+                                        os.path.join(temp_dir, rendition.name), rendition,
+                                        self.segment_seconds, self.timeout)
+                        for rendition in renditions
+                    ]
+                    for future in futures:
+                        future.result()
+                write_master_playlist(temp_dir, renditions)
+                shutil.rmtree(ladder_dir, ignore_errors=True)
+                os.replace(temp_dir, ladder_dir)
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.info(f"Built HLS ladder {', '.join(r.name for r in renditions)} for {os.path.basename(video_file)}")
+        return master
+
+    def prune(self, video_dirs):
+        """Remove ladders whose source video is gone, e.g. evicted from the render cache"""
+        removed = 0
+        for name in os.listdir(self.hls_dir):
+            path = os.path.join(self.hls_dir, name)
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            sources = [os.path.join(video_dir, f'{name}.{fmt}')
+                       for video_dir in video_dirs for fmt in ('mp4', 'webm', 'mov')]
+            if not any(os.path.exists(source) for source in sources):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def stats(self):
+        ladders = [
+            name for name in os.listdir(self.hls_dir)
+            if os.path.exists(os.path.join(self.hls_dir, name, MASTER_PLAYLIST))
+        ]
+        return {
+            'ladders': len(ladders),
+            'renditions': [f'{r.name}@{r.kbps}k' for r in self.renditions],
+        }
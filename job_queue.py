@@ -0,0 +1,186 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class JobError(Exception):
+    """Expected pipeline failure that should be reported back to the client"""
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class Job:
+    """A single video generation request tracked by the job queue"""
+
+    def __init__(self, concept, user_ip=None, options=None):
+        self.id = uuid.uuid4().hex
+        self.concept = concept
+        self.user_ip = user_ip
+        self.options = options or {}
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.result = None
+        self.error = None
+        self.preview_url = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.condition = threading.Condition()
+
+    def set_stage(self, stage):
+        """Record the pipeline stage the job is currently in"""
+        self.stage = stage
+        logger.info(f"Job {self.id} stage: {stage}")
+        self.emit('stage', stage=stage)
+
+    def emit(self, event_type, **data):
+        """Publish an event to clients streaming this job"""
+        data['type'] = event_type
+        data['time'] = time.time()
+        with self.condition:
+            self.events.append(data)
+            self.condition.notify_all()
+
+    def wait_events(self, since, timeout=15):
+        """Block until events after index `since` exist, the job ends or timeout"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: len(self.events) > since or self.finished,
+                timeout=timeout
+            )
+            return self.events[since:]
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        """Serialize the job for the status endpoint"""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'concept': self.concept,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.preview_url:
+            data['preview_url'] = self.preview_url
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    """Bounded worker pool that runs generation jobs in the background"""
+
+    def __init__(self, max_workers=2, max_pending=20, retention=3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='generation'
+        )
+
+    def submit(self, func, concept, user_ip=None, options=None):
+        """Queue func(job) for execution and return the new job"""
+        with self.lock:
+            self._prune()
+            if self.pending_count() >= self.max_pending:
+                raise QueueFullError(
+                    f"Job queue is full ({self.max_pending} jobs waiting)"
+                )
+            job = Job(concept, user_ip, options)
+            self.jobs[job.id] = job
+
+        self.executor.submit(self._run, func, job)
+        logger.info(f"Queued job {job.id} for concept: {concept}")
+        return job
+
+    def get(self, job_id):
+        """Return the job with the given id, or None"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def pending_count(self):
+        """Number of jobs that have not started yet"""
+        return sum(1 for job in self.jobs.values() if job.status == 'queued')
+
+    def queue_position(self, job):
+        """1-based position of a queued job, or 0 once it has started"""
+        if job.status != 'queued':
+            return 0
+        with self.lock:
+            queued = [j for j in self.jobs.values() if j.status == 'queued']
+        queued.sort(key=lambda j: j.created_at)
+        return queued.index(job) + 1 if job in queued else 0
+
+    def stats(self):
+        """Summary of queue utilisation"""
+        with self.lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'succeeded': statuses.count('succeeded'),
+            'failed': statuses.count('failed'),
+        }
+
+    def _run(self, func, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        status = 'failed'
+        try:
+            job.result = func(job)
+            status = 'succeeded'
+        except JobError as e:
+            job.error = {'error': e.message}
+            if e.details is not None:
+                job.error['details'] = e.details
+        except Exception as e:
+            logger.error(f"Job {job.id} crashed: {str(e)}")
+            job.error = {'error': 'Internal server error', 'details': str(e)}
+        finally:
+            # finished_at first: a job that reads as finished always has it
+            job.finished_at = time.time()
+            job.status = status
+            job.stage = job.status
+            job.emit('done', status=job.status)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# Global queue instance
+job_queue = JobQueue(
+    max_workers=int(os.getenv('GENERATION_WORKERS', 2)),
+    max_pending=int(os.getenv('GENERATION_QUEUE_SIZE', 20)),
+    retention=int(os.getenv('JOB_RETENTION_SECONDS', 3600))
+)
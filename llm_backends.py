@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+from code_stream import StreamedResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('gemini', 'record', 'replay')
+
+# Failure kinds the replay backend can inject
+FAILURE_KINDS = ('empty', 'max_tokens', 'bad_fence', 'error')
+
+# Characters per streamed chunk in replay mode, roughly what Gemini sends
+STREAM_CHUNK_CHARS = 200
+
+
+def prompt_key(model, contents):
+    """Stable key for a request; sampling settings are deliberately left out"""
+    if not isinstance(contents, str):
+        contents = json.dumps(contents, sort_keys=True, default=str)
+    return hashlib.sha256(f'{model}\0{contents}'.encode('utf-8')).hexdigest()
+
+
+def parse_failure_rates(spec):
+    """Parse 'empty=0.1,max_tokens=0.05' into a dict of failure probabilities"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        kind, _, rate = item.partition('=')
+        kind = kind.strip()
+        if kind not in FAILURE_KINDS:
+            raise ValueError(f'Unknown failure kind: {kind} (expected one of {", ".join(FAILURE_KINDS)})')
+        rates[kind] = float(rate)
+    if sum(rates.values()) > 1:
+        raise ValueError('Failure rates add up to more than 1')
+    return rates
+
+
+def finish_reason_name(response):
+    candidates = getattr(response, 'candidates', None)
+    if not candidates or not getattr(candidates[0], 'finish_reason', None):
+        return None
+    reason = candidates[0].finish_reason
+    return getattr(reason, 'name', str(reason))
+
+
+def standin_response(key):
+    """Deterministic, valid Manim scene for prompts that were never recorded"""
+    rng = random.Random(key)
+    steps = rng.randint(4, 7)
+    lines = [
+        'from manim import *',
+        '',
+        'class MainScene(Scene):',
+        '    def construct(self):',
+        f'        title = Text("Offline scene {key[:8]}", font_size=40, color=YELLOW)',
+        '        self.play(Write(title), run_time=1)',
+        '        self.play(title.animate.to_edge(UP), run_time=1)',
+    ]
+    for step in range(steps):
+        shape = rng.choice(['Circle()', 'Square()', 'Triangle()', 'RegularPolygon(n=6)'])
+        color = rng.choice(['BLUE', 'GREEN', 'RED', 'TEAL', 'GOLD'])
+        lines += [
+            f'        # Step {step + 1}: show a shape and describe it',
+            f'        shape_{step} = {shape}.set_color({color})',
+            f'        label_{step} = Text("Step {step + 1}", font_size=24).next_to(shape_{step}, DOWN)',
+            f'        self.play(Create(shape_{step}), Write(label_{step}), run_time=1)',
+            f'        self.play(shape_{step}.animate.rotate(PI / 4).scale(0.8), run_time=1)',
+            f'        self.play(FadeOut(shape_{step}), FadeOut(label_{step}), run_time=0.5)',
+        ]
+    lines += [
+        '        self.play(FadeOut(title), run_time=1)',
+        '        self.wait(1)',
+    ]
+    code = '\n'.join(lines)
+    return f'Here is the animation:\n\n```python\n{code}\n```\n'
+
+
+class ReplayServerError(Exception):
+    """Injected API failure; carries a status code like the SDK's APIError"""
+
+    def __init__(self, code=503, message='Injected server error'):
+        super().__init__(f'{code} {message}')
+        self.code = code
+
+
+class RecordingStore:
+    """SQLite store of recorded responses, several per prompt key"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS recordings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    finish_reason TEXT,
+                    latency REAL NOT NULL,
+                    created_at REAL NOT NULL
+                )'''
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS recordings_key ON recordings (key)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, key, model, prompt, text, finish_reason, latency):
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt, default=str)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    '''INSERT INTO recordings (key, model, prompt, text, finish_reason, latency, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    (key, model, prompt, text, finish_reason, latency, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Storing LLM recording failed: {str(e)}")
+
+    def responses(self, key):
+        """Recorded (text, finish_reason, latency) tuples for a key, oldest first"""
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    'SELECT text, finish_reason, latency FROM recordings WHERE key = ? ORDER BY id',
+                    (key,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"LLM recording lookup failed: {str(e)}")
+            return []
+
+    def count(self):
+        try:
+            with self._connect() as conn:
+                return conn.execute('SELECT COUNT(*) FROM recordings').fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+
+class RecordingClient:
+    """Passes calls to a real client and stores every response it returns.
+
+    Exposes the same models.generate_content / generate_content_stream
+    interface as genai.Client, so it can sit behind the LLM gateway.
+    """
+
+    def __init__(self, client, store):
+        self.client = client
+        self.store = store
+        self.models = self
+        self.recorded = 0
+
+    def generate_content(self, model, contents, **kwargs):
+        start = time.monotonic()
+        response = self.client.models.generate_content(model=model, contents=contents, **kwargs)
+        text = getattr(response, 'text', None) or ''
+        self._record(model, contents, text, finish_reason_name(response), time.monotonic() - start)
+        return response
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        start = time.monotonic()
+        parts = []
+        finish_reason = None
+        try:
+            for chunk in self.client.models.generate_content_stream(model=model, contents=contents, **kwargs):
+                finish_reason = finish_reason_name(chunk) or finish_reason
+                if chunk.text:
+                    parts.append(chunk.text)
+                yield chunk
+        finally:
+            # Also keep streams the caller stopped reading at the closing fence
+            if parts:
+                self._record(model, contents, ''.join(parts), finish_reason, time.monotonic() - start)
+
+    def _record(self, model, contents, text, finish_reason, latency):
+        self.store.add(prompt_key(model, contents), model, contents, text, finish_reason, latency)
+        self.recorded += 1
+
+    def stats(self):
+        return {'backend': 'record', 'recorded': self.recorded, 'recordings': self.store.count()}
+
+
+class ReplayClient:
+    """Answers from recorded responses without touching the network.
+
+    Repeated calls for the same prompt cycle through its recordings, the way
+    retries would see different answers. Prompts that were never recorded
+    get a deterministic stand-in scene. Latency and failures are drawn from
+    a generator seeded with the run seed, the prompt and how often that
+    prompt has been asked, so concurrent benchmark runs are reproducible
+    whatever order their calls interleave in.
+    """
+
+    def __init__(self, store, latency=None, jitter=0.0, failure_rates=None, seed=0):
+        self.store = store
+        self.models = self
+        # None replays the latency that was recorded
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rates = failure_rates or {}
+        self.seed = seed
+        self.positions = {}
+        self.lock = threading.Lock()
+        self.counters = {'calls': 0, 'replayed': 0, 'standin': 0}
+        self.counters.update({kind: 0 for kind in FAILURE_KINDS})
+
+    def generate_content(self, model, contents, **kwargs):
+        text, finish_reason, delay = self._respond(model, contents)
+        time.sleep(delay)
+        return StreamedResponse(text, finish_reason)
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        text, finish_reason, delay = self._respond(model, contents)
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or ['']
+        for index, chunk in enumerate(chunks):
+            time.sleep(delay / len(chunks))
+            last = index == len(chunks) - 1
+            yield StreamedResponse(chunk, finish_reason if last else None)
+
+    def _respond(self, model, contents):
+        key = prompt_key(model, contents)
+        recordings = self.store.responses(key)
+        with self.lock:
+            self.counters['calls'] += 1
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            if recordings:
+                text, finish_reason, recorded_latency = recordings[position % len(recordings)]
+                self.counters['replayed'] += 1
+            else:
+                text, finish_reason, recorded_latency = standin_response(key), 'STOP', 0.0
+                self.counters['standin'] += 1
+
+            rng = random.Random(f'{self.seed}\0{key}\0{position}')
+            latency = recorded_latency if self.latency is None else self.latency
+            delay = max(latency + rng.uniform(-self.jitter, self.jitter), 0)
+            failure = self._pick_failure(rng)
+            if failure:
+                self.counters[failure] += 1
+
+        if failure == 'error':
+            time.sleep(delay)
+            raise ReplayServerError()
+        if failure == 'empty':
+            return '', 'STOP', delay
+        if failure == 'max_tokens':
+            return text[:len(text) // 2], 'MAX_TOKENS', delay
+        if failure == 'bad_fence':
+            # Mislabelled opening fence and no closing fence
+            return text.replace('```python', '```py thon', 1).rstrip().rstrip('`'), finish_reason, delay
+        return text, finish_reason, delay
+
+    def _pick_failure(self, rng):
+        roll = rng.random()
+        for kind in FAILURE_KINDS:
+            rate = self.failure_rates.get(kind, 0)
+            if roll < rate:
+                return kind
+            roll -= rate
+        return None
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        counters['backend'] = 'replay'
+        return counters
+
+
+def create_llm_client(backend, gemini_client, recordings_path, latency=None, jitter=0.0,
+                      failure_rates=None, seed=0):
+    """Client for the configured backend: the real one, a recorder or a replayer"""
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown LLM backend: {backend} (expected one of {", ".join(BACKENDS)})')
+    if backend == 'gemini':
+        return gemini_client
+    store = RecordingStore(recordings_path)
+    if backend == 'record':
+        logger.info(f"Recording Gemini responses to {recordings_path}")
+        return RecordingClient(gemini_client, store)
+    logger.info(f"Replaying LLM responses from {recordings_path} ({store.count()} recorded)")
+    return ReplayClient(store, latency=latency, jitter=jitter, failure_rates=failure_rates, seed=seed)
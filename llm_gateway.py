@@ -0,0 +1,267 @@
+import time
+import random
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server errors
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the gateway refuses or gives up on a call; callers should degrade"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised while the circuit breaker is open"""
+
+
+class DeadlineExceededError(LLMUnavailableError):
+    """Raised when a call cannot finish within its deadline"""
+
+
+def is_retryable(error):
+    """True for transient failures: retryable HTTP statuses, timeouts and connection errors"""
+    status = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # httpx and the SDK raise their own timeout / connection error classes
+    name = type(error).__name__
+    return 'Timeout' in name or 'Connect' in name or 'RemoteProtocol' in name
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take a token, waiting at most timeout seconds; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and lets one trial call
+    through every `reset_timeout` seconds until a call succeeds again."""
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("LLM circuit breaker closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def cancel_trial(self):
+        """Give back a half-open trial that never reached the API"""
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.threshold):
+                if self.opened_at is None:
+                    self.times_opened += 1
+                    logger.warning(f"LLM circuit breaker opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'times_opened': self.times_opened,
+        }
+
+
+class LLMGateway:
+    """Shared entry point for Gemini calls.
+
+    Bounds concurrency, rate limits with a token bucket, retries transient
+    failures with exponential backoff and full jitter inside a per-call
+    deadline, and stops calling through a circuit breaker while the API is
+    failing. The wrapped client keeps its HTTP connections alive between calls.
+    """
+
+    def __init__(self, client, max_concurrency=4, rate_per_minute=60, burst=10,
+                 max_retries=3, base_delay=1.0, max_delay=20.0, deadline=120,
+                 breaker_threshold=5, breaker_reset=30):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, deadline=None, **kwargs):
+        """client.models.generate_content with admission control and retries"""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._admit(deadline_at)
+            try:
+                response = self.client.models.generate_content(**kwargs)
+            except Exception as e:
+                self._release()
+                self._backoff(e, attempt, deadline_at)
+                attempt += 1
+                continue
+            self._release()
+            self.breaker.record_success()
+            return response
+
+    def generate_content_stream(self, deadline=None, **kwargs):
+        """client.models.generate_content_stream with admission control.
+
+        Retries only until the first chunk arrives; output already handed to
+        the caller cannot be taken back.
+        """
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._admit(deadline_at)
+            received = False
+            stream = None
+            try:
+                stream = self.client.models.generate_content_stream(**kwargs)
+                for chunk in stream:
+                    received = True
+                    yield chunk
+                self.breaker.record_success()
+                return
+            except GeneratorExit:
+                # The caller stopped reading; the API itself was fine
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if received:
+                    self.breaker.record_failure()
+                    raise
+                error = e
+            finally:
+                # Stop the provider stream too when the caller abandons ours
+                if hasattr(stream, 'close'):
+                    stream.close()
+                self._release()
+            self._backoff(error, attempt, deadline_at)
+            attempt += 1
+
+    def _admit(self, deadline_at):
+        if time.monotonic() >= deadline_at:
+            self._reject()
+            raise DeadlineExceededError('Gemini call deadline exceeded before the next attempt')
+        if not self.breaker.allow():
+            self._reject()
+            raise CircuitOpenError('Gemini circuit breaker is open')
+        if not self.bucket.acquire(max(deadline_at - time.monotonic(), 0)):
+            self._reject()
+            self.breaker.cancel_trial()
+            raise DeadlineExceededError('Gemini rate limit would exceed the call deadline')
+        if not self.semaphore.acquire(timeout=max(deadline_at - time.monotonic(), 0)):
+            self._reject()
+            self.breaker.cancel_trial()
+            raise DeadlineExceededError('No free Gemini connection before the call deadline')
+        with self.lock:
+            self.in_flight += 1
+            self.calls += 1
+
+    def _release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.semaphore.release()
+
+    def _reject(self):
+        with self.lock:
+            self.rejected += 1
+
+    def _backoff(self, error, attempt, deadline_at):
+        """Sleep before retrying a failed call, or raise if it should not be retried.
+
+        Transient failures that run out of retries or time surface as
+        LLMUnavailableError chained from the last error; a request the API
+        rejected outright is re-raised as is.
+        """
+        if not is_retryable(error):
+            # The API answered; the request itself was bad
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise LLMUnavailableError(f'Gemini call failed after {attempt + 1} attempts: {error}') from error
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if time.monotonic() + delay >= deadline_at:
+            raise DeadlineExceededError(f'Gemini call deadline exceeded after {attempt + 1} attempts') from error
+        logger.warning(f"Gemini call failed ({error}), retrying in {delay:.1f}s")
+        with self.lock:
+            self.retries += 1
+        time.sleep(delay)
+
+    def stats(self):
+        with self.lock:
+            counters = {
+                'in_flight': self.in_flight,
+                'max_concurrency': self.max_concurrency,
+                'calls': self.calls,
+                'retries': self.retries,
+                'rejected': self.rejected,
+            }
+        counters['breaker'] = self.breaker.stats()
+        return counters
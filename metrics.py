@@ -0,0 +1,129 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, from fast local steps to long renders
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class StageStats:
+    """Latency samples for one pipeline stage"""
+
+    def __init__(self, buckets, window):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        # Percentiles come from recent samples so they follow regressions
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        if error:
+            self.errors += 1
+        self.recent.append(seconds)
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def percentile(self, samples, percent):
+        """Nearest-rank percentile of an already sorted sample list"""
+        if not samples:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(samples)))
+        return samples[rank - 1]
+
+    def to_dict(self):
+        samples = sorted(self.recent)
+        cumulative = 0
+        histogram = []
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            histogram.append({'le': bound, 'count': cumulative})
+        histogram.append({'le': '+Inf', 'count': self.count})
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'percentiles': {
+                f'p{percent}': self.percentile(samples, percent) for percent in PERCENTILES
+            },
+            'histogram': histogram,
+        }
+
+
+class StageMetrics:
+    """Thread-safe latency histograms and percentiles per pipeline stage"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1000):
+        self.buckets = tuple(buckets)
+        self.window = window
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False):
+        """Record one duration for a stage"""
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.buckets, self.window)
+            stats.observe(seconds, error)
+        logger.debug(f"stage={stage} seconds={seconds:.4f} error={error}")
+
+    @contextmanager
+    def span(self, stage):
+        """Time the with-block as one sample of `stage`, counting exceptions as errors"""
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, error)
+
+    def snapshot(self):
+        """Per-stage counts, percentiles and cumulative histograms"""
+        with self.lock:
+            return {stage: stats.to_dict() for stage, stats in sorted(self.stages.items())}
+
+    def to_prometheus(self, name='manim_stage_duration_seconds'):
+        """Render the histograms in the Prometheus text exposition format"""
+        lines = [
+            f'# HELP {name} Duration of each video generation pipeline stage',
+            f'# TYPE {name} histogram',
+        ]
+        for stage, data in self.snapshot().items():
+            for bucket in data['histogram']:
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bucket["le"]}"}} {bucket["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {data["count"]}')
+        errors_name = name.replace('_duration_seconds', '_errors_total')
+        lines.append(f'# HELP {errors_name} Pipeline stage executions that raised')
+        lines.append(f'# TYPE {errors_name} counter')
+        for stage, data in self.snapshot().items():
+            lines.append(f'{errors_name}{{stage="{stage}"}} {data["errors"]}')
+        return '\n'.join(lines) + '\n'
+
+
+# Shared instance used by the web app
+stage_metrics = StageMetrics()
@@ -0,0 +1,174 @@
+import os
+import re
+import logging
+import threading
+from contextlib import contextmanager
+
+from shared_files import SeedIndex, link_file, publish_file, touch, evict_lru, usage
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Renders write their partial movies to {media_dir}/partial_movies
+PARTIAL_SUBDIR = 'partial_movies'
+
+# Manim's list of the partial movies it joined into the final video
+FILE_LIST = 'partial_movie_file_list.txt'
+
+# Written per render so the manim CLI uses our partial movie directory
+CONFIG_FILE = 'manim.cfg'
+
+
+def partial_movie_dir(media_dir):
+    return os.path.join(media_dir, PARTIAL_SUBDIR)
+
+
+def config_file(media_dir):
+    return os.path.join(media_dir, CONFIG_FILE)
+
+
+def used_partials(partial_dir):
+    """Names of the partial movies listed for the last combine, in order"""
+    try:
+        with open(os.path.join(partial_dir, FILE_LIST), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    names = []
+    for line in lines:
+        match = re.match(r"^file '(?:file:)?(.*)'$", line.strip())
+        if match:
+            names.append(os.path.basename(match.group(1)))
+    return names
+
+
+class PartialReuse:
+    """Partial movies one render reused from the cache or rendered itself"""
+
+    def __init__(self):
+        self.reused = 0
+        self.rendered = 0
+
+    def to_dict(self):
+        return {'reused': self.reused, 'rendered': self.rendered}
+
+
+class PartialMovieCache:
+    """Per-animation movies shared by every render job.
+
+    Manim names each partial movie after a hash of the camera, the animation
+    and the mobjects on screen, and skips rasterizing an animation whose
+    file already exists. Cached files are grouped by namespace (quality,
+    frame rate, format and Manim version), since the hash does not cover all
+    of those. attach() links the movies a SeedIndex picks for the scene
+    into the job's partial movie directory before the render and publishes
+    new partial movies afterwards with an atomic rename.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3, max_recent=500):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_recent = max_recent
+        self.indexes = {}
+        self.reused = 0
+        self.rendered = 0
+        self.published = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def namespace(self, quality, fps, fmt, version):
+        name = f'{quality}_{fps or "preset"}fps_{fmt}_manim{version}'
+        return re.sub(r'[^\w.-]', '_', name)
+
+    def index(self, namespace):
+        with self.lock:
+            if namespace not in self.indexes:
+                self.indexes[namespace] = SeedIndex(
+                    os.path.join(self.cache_dir, namespace, '*'), self.max_recent
+                )
+            return self.indexes[namespace]
+
+    def write_config(self, media_dir):
+        """manim.cfg pointing the CLI at the job's partial movie directory"""
+        with open(config_file(media_dir), 'w', encoding='utf-8') as f:
+            f.write('[CLI]\n')
+            f.write(f'partial_movie_dir = {os.path.abspath(partial_movie_dir(media_dir))}\n')
+            # Eviction is ours; Manim would otherwise delete seeded files after the render
+            f.write('max_files_cached = 1000000\n')
+
+    @contextmanager
+    def attach(self, media_dir, namespace, key):
+        """Seed the job's partial movies for the scene with this key and publish what it rendered.
+
+        Yields a PartialReuse that is filled in once the render finishes.
+        """
+        os.makedirs(media_dir, exist_ok=True)
+        self.write_config(media_dir)
+        partial_dir = partial_movie_dir(media_dir)
+        seeded = self.seed(partial_dir, namespace, key)
+        reuse = PartialReuse()
+        try:
+            yield reuse
+        finally:
+            self.publish(partial_dir, namespace, key, seeded, reuse)
+
+    def seed(self, partial_dir, namespace, key):
+        os.makedirs(partial_dir, exist_ok=True)
+        shared_dir = os.path.join(self.cache_dir, namespace)
+        seeded = set()
+        for name in self.index(namespace).names(key):
+            path = os.path.join(shared_dir, name)
+            # Evicted since it was last used
+            if os.path.exists(path) and link_file(path, os.path.join(partial_dir, name)):
+                seeded.add(name)
+        return seeded
+
+    def publish(self, partial_dir, namespace, key, seeded, reuse):
+        shared_dir = os.path.join(self.cache_dir, namespace)
+        os.makedirs(shared_dir, exist_ok=True)
+        published = 0
+        names = used_partials(partial_dir)
+        self.index(namespace).record(key, [name for name in names if not name.startswith('uncached_')])
+        for name in names:
+            if name in seeded:
+                reuse.reused += 1
+                touch(os.path.join(shared_dir, name))
+                continue
+            reuse.rendered += 1
+            # Animations Manim could not hash are rendered as uncached_*.mp4
+            if name.startswith('uncached_'):
+                continue
+            source = os.path.join(partial_dir, name)
+            if os.path.exists(source) and publish_file(source, os.path.join(shared_dir, name)):
+                published += 1
+
+        with self.lock:
+            self.reused += reuse.reused
+            self.rendered += reuse.rendered
+            self.published += published
+        if reuse.reused:
+            logger.info(f"Reused {reuse.reused} of {reuse.reused + reuse.rendered} partial movies")
+        if published:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used partial movies until the cache fits max_bytes"""
+        removed = evict_lru(os.path.join(self.cache_dir, '*', '*'), self.max_bytes)
+        with self.lock:
+            self.evictions += removed
+
+    def stats(self):
+        """Reuse counters and current directory usage"""
+        count, size = usage(os.path.join(self.cache_dir, '*', '*'))
+        total = self.reused + self.rendered
+        return {
+            'reused': self.reused,
+            'rendered': self.rendered,
+            'published': self.published,
+            'evictions': self.evictions,
+            'reuse_rate': self.reused / total if total else 0.0,
+            'partial_movies': count,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pre-render the built-in template scenes into the template asset store.
+Run this after deploying or after editing a template; unchanged templates are skipped.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+from app import (
+    RENDER_FORMAT, RENDER_QUALITY_FLAGS, RENDER_TIMEOUT, RENDER_STALL_TIMEOUT,
+    build_manim_command, get_template_mappings, postprocess_rendered_video,
+    shared_render_caches, template_assets
+)
+from renderer import run_manim, find_rendered_video
+
+def render_template(name, code, quality):
+    """Render one template at one quality and move it into the asset store"""
+    temp_dir = tempfile.mkdtemp(prefix=f'template_{name}_')
+    try:
+        code_file = os.path.join(temp_dir, 'scene.py')
+        with open(code_file, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+        media_dir = os.path.join(temp_dir, 'media')
+        command = build_manim_command(code_file, media_dir, quality)
+        with shared_render_caches(media_dir, code, quality):
+            result = run_manim(command, cwd=temp_dir, timeout=RENDER_TIMEOUT,
+                               stall_timeout=RENDER_STALL_TIMEOUT)
+        video_file = find_rendered_video(media_dir, fmt=RENDER_FORMAT)
+        if result.returncode != 0 or not video_file:
+            print(f"❌ {name} ({quality}) failed to render:")
+            print(result.output[-2000:])
+            return None
+        video_file = postprocess_rendered_video(video_file, quality)
+        return template_assets.store(name, code, quality, video_file, RENDER_FORMAT)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def prerender_templates(force=False):
+    """Render every template at every quality that is missing from the store"""
+    keep = []
+    failures = 0
+    for name, template_info in get_template_mappings().items():
+        code = template_info['generator']()
+        for quality in RENDER_QUALITY_FLAGS:
+            existing = template_assets.lookup(name, code, quality, RENDER_FORMAT)
+            if existing and not force:
+                print(f"✓ {name} ({quality}) is up to date")
+                keep.append(existing)
+                continue
+
+            print(f"Rendering {name} ({quality})...")
+            path = render_template(name, code, quality)
+            if path:
+                print(f"✅ {name} ({quality}) -> {os.path.basename(path)}")
+                keep.append(path)
+            else:
+                failures += 1
+
+    removed = template_assets.prune(keep)
+    print(f"Done: {len(keep)} assets ready, {failures} failed, {removed} stale removed")
+    return failures == 0
+
+if __name__ == "__main__":
+    success = prerender_templates(force='--force' in sys.argv)
+    sys.exit(0 if success else 1)
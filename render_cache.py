@@ -0,0 +1,181 @@
+import os
+import glob
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class KeyLocks:
+    """Per-key locks that exist only while someone holds or waits for them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    @contextmanager
+    def hold(self, key, blocking=True):
+        """Hold the lock for key; with blocking=False yields False instead of waiting"""
+        with self.lock:
+            entry = self.entries.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.entries[key]
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+class RenderCache:
+    """Content-addressed cache of rendered videos kept in static/videos.
+
+    Outputs derived from a cached video, such as its HLS ladder, can be
+    registered with add_derived(); they count towards max_bytes and are
+    evicted together with the video. A derived store provides
+    size(video_path) and remove(video_path).
+    """
+
+    def __init__(self, video_dir, max_bytes=2 * 1024 ** 3):
+        self.video_dir = video_dir
+        self.max_bytes = max_bytes
+        self.derived = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.key_locks = KeyLocks()
+        os.makedirs(video_dir, exist_ok=True)
+
+    def add_derived(self, store):
+        self.derived.append(store)
+
+    def _derived_size(self, path):
+        return sum(store.size(path) for store in self.derived)
+
+    def key(self, code, quality, fmt='mp4'):
+        """Hash the final scene source together with the render flags"""
+        digest = hashlib.sha256()
+        digest.update(code.encode('utf-8'))
+        digest.update(f'\0{quality}\0{fmt}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def name(self, key):
+        """Name of the cached video for a key, without extension"""
+        return f'render_{key[:32]}'
+
+    def filename(self, key, fmt='mp4'):
+        """Name of the cached video for a key"""
+        return f'{self.name(key)}.{fmt}'
+
+    def path(self, key, fmt='mp4'):
+        return os.path.join(self.video_dir, self.filename(key, fmt))
+
+    def key_lock(self, key):
+        """Lock held while a key is looked up or rendered so duplicate jobs wait
+        for the first and eviction leaves the video alone"""
+        return self.key_locks.hold(self.name(key))
+
+    def lookup(self, key, fmt='mp4'):
+        """Return the cached video path for a key, or None on a miss"""
+        path = self.path(key, fmt)
+        if os.path.exists(path):
+            self._touch(path)
+            with self.lock:
+                self.hits += 1
+            logger.info(f"Render cache hit: {os.path.basename(path)}")
+            return path
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def _touch(self, path):
+        """Mark a video as recently used for eviction.
+
+        Only the access time is bumped: the modification time feeds the
+        ETag and Last-Modified headers and must stay stable between hits.
+        """
+        try:
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+
+    def store(self, key, source_path, fmt='mp4'):
+        """Move a freshly rendered video into the cache and return its path"""
+        path = self.path(key, fmt)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        shutil.move(source_path, temp_path)
+        os.replace(temp_path, path)
+        self._touch(path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Delete least recently used videos until the directory fits max_bytes"""
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.video_dir, '*.mp4')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            size = stat.st_size + self._derived_size(path)
+            entries.append((stat.st_atime, size, path))
+            total += size
+
+        entries.sort()
+        for atime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Skip videos a job is looking up or rendering right now
+            with self.key_locks.hold(os.path.splitext(os.path.basename(path))[0], blocking=False) as held:
+                if not held:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not evict {path}: {str(e)}")
+                    continue
+                for store in self.derived:
+                    store.remove(path)
+            total -= size
+            with self.lock:
+                self.evictions += 1
+            logger.info(f"Evicted cached video {os.path.basename(path)}")
+
+    def stats(self):
+        """Hit/miss counters and current directory usage"""
+        size = 0
+        count = 0
+        for path in glob.glob(os.path.join(self.video_dir, '*.mp4')):
+            try:
+                size += os.path.getsize(path) + self._derived_size(path)
+                count += 1
+            except OSError:
+                continue
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'videos': count,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,136 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFullError(Exception):
+    """Raised when a render cannot be admitted; carries a Retry-After hint"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderTicket:
+    """Admission for one job; holds a render slot only while rendering"""
+
+    def __init__(self, limiter, client):
+        self.limiter = limiter
+        self.client = client
+        self.closed = False
+
+    @contextmanager
+    def slot(self, weight=1):
+        """Block until `weight` render slots are free and hold them for the with-block"""
+        weight = self.limiter._acquire(self, weight)
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.limiter._release(self, weight, time.time() - started)
+
+    def close(self):
+        """Give up the admission once the job has finished"""
+        if not self.closed:
+            self.closed = True
+            self.limiter._discharge(self)
+
+
+class RenderLimiter:
+    """Bounds concurrent renders per host and per client with a bounded wait queue.
+
+    Render slots are handed out in arrival order: the oldest waiter keeps
+    the slots that free up until it has all it asked for, so a steady stream
+    of single-slot renders cannot starve a parallel render.
+    """
+
+    def __init__(self, max_concurrent=2, max_waiting=10, per_client=0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.per_client = per_client
+        self.active = 0
+        self.admitted = 0
+        self.client_counts = {}
+        self.rejected = 0
+        self.render_times = deque(maxlen=50)
+        self.waiters = deque()
+        self.condition = threading.Condition()
+
+    def admit(self, client=None):
+        """Admit a job or raise RenderQueueFullError immediately"""
+        with self.condition:
+            if self.admitted >= self.max_concurrent + self.max_waiting:
+                self.rejected += 1
+                logger.warning(f"Rejecting render for {client}: queue is full")
+                raise RenderQueueFullError(
+                    f'Render queue is full ({self.admitted - self.active} waiting)',
+                    self.retry_after()
+                )
+            if self.per_client and self.client_counts.get(client, 0) >= self.per_client:
+                self.rejected += 1
+                logger.warning(f"Rejecting render for {client}: per-client limit reached")
+                raise RenderQueueFullError(
+                    f'Too many renders in progress for this client (limit {self.per_client})',
+                    self.retry_after()
+                )
+            self.admitted += 1
+            self.client_counts[client] = self.client_counts.get(client, 0) + 1
+        return RenderTicket(self, client)
+
+    def retry_after(self):
+        """Seconds until a slot is likely to free up, from recent render times"""
+        average = sum(self.render_times) / len(self.render_times) if self.render_times else 30
+        waiting = max(self.admitted - self.active, 0)
+        return max(1, math.ceil(average * (waiting + 1) / self.max_concurrent))
+
+    def stats(self):
+        """Current utilisation and queue depth"""
+        with self.condition:
+            return {
+                'active': self.active,
+                'waiting': self.admitted - self.active,
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'per_client': self.per_client,
+                'rejected': self.rejected,
+                'retry_after': self.retry_after(),
+            }
+
+    def _acquire(self, ticket, weight):
+        # A render can never need more slots than exist
+        weight = max(1, min(weight, self.max_concurrent))
+        waiter = object()
+        with self.condition:
+            self.waiters.append(waiter)
+            try:
+                self.condition.wait_for(
+                    lambda: self.waiters[0] is waiter and self.active + weight <= self.max_concurrent
+                )
+            finally:
+                self.waiters.remove(waiter)
+                # The next waiter may fit in the slots that are still free
+                self.condition.notify_all()
+            self.active += weight
+        return weight
+
+    def _release(self, ticket, weight, duration):
+        with self.condition:
+            self.active -= weight
+            self.render_times.append(duration)
+            self.condition.notify_all()
+
+    def _discharge(self, ticket):
+        with self.condition:
+            self.admitted -= 1
+            count = self.client_counts.get(ticket.client, 1) - 1
+            if count > 0:
+                self.client_counts[ticket.client] = count
+            else:
+                self.client_counts.pop(ticket.client, None)
+            self.condition.notify_all()
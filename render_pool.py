@@ -0,0 +1,196 @@
+import queue
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+import traceback
+import multiprocessing
+
+from scene_runner import run_render_job, run_dry_run_job, use_tex_template
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+
+
+class RenderPoolTimeoutError(Exception):
+    """Raised when a pooled render exceeds its time budget"""
+
+
+def _init_worker(progress_queue):
+    """Pre-import Manim and warm up Cairo/Pango once per worker process"""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    from manim import Text, MathTex, tempconfig
+    try:
+        Text('warm up')
+    except Exception as e:
+        logger.warning(f"Render worker warm-up failed: {str(e)}")
+
+    # One throwaway formula pulls latex, dvisvgm and their files into the OS cache
+    media_dir = tempfile.mkdtemp(prefix='render_warmup_')
+    try:
+        with tempconfig({'media_dir': media_dir}):
+            use_tex_template()
+            MathTex(r'x^2')
+    except Exception as e:
+        logger.warning(f"Render worker LaTeX warm-up failed: {str(e)}")
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+
+def _worker_main(conn, progress_queue):
+    """Run tasks sent over conn until told to stop or the parent goes away"""
+    _init_worker(progress_queue)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        func, args = task
+        try:
+            result = func(*args)
+        except Exception:
+            result = {'ok': False, 'error': traceback.format_exc()}
+        conn.send(result)
+
+
+def _render_in_worker(token, source, code_file, media_dir, quality, fmt, fps):
+    def on_animation(progress):
+        _progress_queue.put((token, progress))
+
+    return run_render_job(source, code_file, media_dir, quality, fmt, fps, on_animation)
+
+
+class _Worker:
+    """One warm worker process and the pipe its tasks go through"""
+
+    def __init__(self, context, progress_queue):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, progress_queue),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class RenderPool:
+    """Long-lived worker processes with Manim already imported.
+
+    Each task runs on a worker of its own, so a task that exceeds its time
+    budget is handled by killing and replacing just that worker; the tasks
+    running beside it are not affected. Workers are recycled after
+    max_jobs_per_worker tasks to bound leaks.
+    """
+
+    def __init__(self, processes=2, max_jobs_per_worker=20):
+        self.processes = processes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.context = multiprocessing.get_context('spawn')
+        self.progress_queue = self.context.Queue()
+        self.callbacks = {}
+        self.idle = queue.Queue()
+        self.closed = False
+
+        logger.info(f"Starting render pool with {self.processes} workers")
+        for _ in range(processes):
+            self.idle.put(self._start_worker())
+
+        listener = threading.Thread(target=self._dispatch_progress, daemon=True)
+        listener.start()
+
+    def _start_worker(self):
+        return _Worker(self.context, self.progress_queue)
+
+    def _dispatch_progress(self):
+        """Forward progress messages from workers to the waiting job"""
+        while True:
+            token, progress = self.progress_queue.get()
+            callback = self.callbacks.get(token)
+            if callback:
+                try:
+                    callback(progress)
+                except Exception as e:
+                    logger.error(f"Progress callback failed: {str(e)}")
+
+    def _run(self, func, args, timeout, label):
+        """Run func(*args) on an idle worker, killing only that worker on timeout"""
+        worker = self.idle.get()
+        try:
+            worker.conn.send((func, args))
+            if not worker.conn.poll(timeout):
+                logger.error(f"Pooled {label} exceeded {timeout} seconds, replacing its worker")
+                worker.kill()
+                worker = self._start_worker()
+                raise RenderPoolTimeoutError(f'{label.capitalize()} exceeded {timeout} seconds')
+            result = worker.conn.recv()
+            worker.jobs += 1
+            return result
+        except (EOFError, OSError) as e:
+            # The worker died mid-task, e.g. killed for memory
+            logger.error(f"Render worker exited during {label}: {str(e)}")
+            worker.kill()
+            worker = self._start_worker()
+            return {'ok': False, 'error': f'Render worker exited unexpectedly during {label}'}
+        finally:
+            self._release(worker)
+
+    def _release(self, worker):
+        if self.closed:
+            worker.stop()
+            return
+        if worker.jobs >= self.max_jobs_per_worker:
+            worker.stop()
+            worker = self._start_worker()
+        self.idle.put(worker)
+
+    def render(self, source, code_file, media_dir, quality='medium', fmt='mp4',
+               fps=None, on_progress=None, timeout=10000):
+        """Render a scene in a warm worker and return run_render_job's result dict"""
+        token = uuid.uuid4().hex
+        if on_progress:
+            self.callbacks[token] = on_progress
+        try:
+            return self._run(
+                _render_in_worker,
+                (token, source, code_file, media_dir, quality, fmt, fps),
+                timeout, 'render'
+            )
+        finally:
+            self.callbacks.pop(token, None)
+
+    def dry_run(self, source, code_file, media_dir, timeout=120):
+        """Execute a scene without rendering frames and return run_dry_run_job's result dict"""
+        return self._run(run_dry_run_job, (source, code_file, media_dir), timeout, 'dry run')
+
+    def close(self):
+        """Stop idle workers; busy ones stop when their task finishes"""
+        self.closed = True
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+            worker.process.join()
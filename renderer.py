@@ -0,0 +1,216 @@
+import os
+import re
+import glob
+import time
+import queue
+import logging
+import threading
+import subprocess
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Matches Manim's tqdm progress bars, e.g.
+# "Animation 3: Write(Text('Hello')):  45%|####5     | 27/60 [00:01<00:01, 20.12it/s]"
+PROGRESS_PATTERN = re.compile(
+    r'Animation (\d+)\s*:\s*(.*?):\s+(\d+)%\|[^|]*\|\s*(\d+)/(\d+)'
+)
+
+# Manim logs this once the scene has finished, including dry runs
+PLAYED_PATTERN = re.compile(r'Played (\d+) animations')
+
+# Keep only the tail of Manim's output for error reporting
+MAX_OUTPUT_CHARS = 200_000
+
+
+class RenderTimeoutError(Exception):
+    """Raised when a render exceeds its total time budget"""
+
+
+class RenderStalledError(Exception):
+    """Raised when Manim produces no output for too long"""
+
+
+class RenderResult:
+    """Exit status and captured output of a Manim render"""
+
+    def __init__(self, returncode, output):
+        self.returncode = returncode
+        self.output = output
+
+
+def parse_progress_line(line):
+    """Parse a Manim progress bar line into a progress dict, or None"""
+    match = PROGRESS_PATTERN.search(line)
+    if not match:
+        return None
+    return {
+        'animation': int(match.group(1)),
+        'description': match.group(2).strip(),
+        'percent': int(match.group(3)),
+        'frame': int(match.group(4)),
+        'frames': int(match.group(5)),
+    }
+
+
+def _read_stream(stream, chunks):
+    """Forward raw output chunks from a pipe until it closes"""
+    try:
+        for chunk in iter(lambda: stream.read1(4096), b''):
+            chunks.put(chunk)
+    finally:
+        chunks.put(None)
+
+
+def run_manim(command, cwd, on_progress=None, timeout=10000, stall_timeout=300):
+    """Run a Manim command, streaming its progress bars to on_progress.
+
+    Progress callbacks are throttled to one per animation per 5% step.
+    Raises RenderTimeoutError or RenderStalledError after killing the process.
+    """
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    chunks = queue.Queue()
+    reader = threading.Thread(target=_read_stream, args=(process.stdout, chunks), daemon=True)
+    reader.start()
+
+    started = time.time()
+    last_output = started
+    output = []
+    output_size = 0
+    pending = ''
+    last_reported = None
+
+    try:
+        while True:
+            now = time.time()
+            if now - started > timeout:
+                raise RenderTimeoutError(f'Render exceeded {timeout} seconds')
+            if now - last_output > stall_timeout:
+                raise RenderStalledError(f'No render output for {stall_timeout} seconds')
+
+            try:
+                chunk = chunks.get(timeout=1)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                break
+
+            last_output = time.time()
+            text = chunk.decode('utf-8', errors='replace')
+            output.append(text)
+            output_size += len(text)
+            while output_size > MAX_OUTPUT_CHARS and len(output) > 1:
+                output_size -= len(output.pop(0))
+
+            # Progress bars redraw with carriage returns, so split on both
+            lines = re.split(r'[\r\n]', pending + text)
+            pending = lines.pop()
+            for line in lines:
+                progress = parse_progress_line(line)
+                if not progress or not on_progress:
+                    continue
+                step = (progress['animation'], progress['percent'] // 5)
+                if step != last_reported:
+                    last_reported = step
+                    on_progress(progress)
+
+        returncode = process.wait(timeout=stall_timeout)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        reader.join(timeout=5)
+        process.stdout.close()
+
+    return RenderResult(returncode, ''.join(output))
+
+
+def parse_animation_count(output):
+    """Return the number of animations Manim reported playing, or None"""
+    matches = PLAYED_PATTERN.findall(output)
+    return int(matches[-1]) if matches else None
+
+
+def split_segments(total, parts):
+    """Split animations 0..total-1 into at most `parts` inclusive ranges"""
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    segments = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0) - 1
+        segments.append((start, end))
+        start = end + 1
+    return segments
+
+
+def find_rendered_video(media_dir, scene_name='MainScene', fmt='mp4'):
+    """Locate the final movie Manim wrote under media_dir, or None"""
+    pattern = os.path.join(media_dir, 'videos', '**', f'{scene_name}.{fmt}')
+    for path in glob.glob(pattern, recursive=True):
+        if 'partial_movie_files' not in path:
+            return path
+    return None
+
+
+def concat_videos(paths, output_file, timeout=600):
+    """Join videos with identical encoding settings using ffmpeg's concat demuxer"""
+    list_file = f'{output_file}.txt'
+    with open(list_file, 'w', encoding='utf-8') as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    command = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'concat', '-safe', '0',
+        '-i', list_file,
+        '-c', 'copy',
+        output_file
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    finally:
+        os.remove(list_file)
+    if result.returncode != 0:
+        raise RuntimeError(f'ffmpeg concat failed: {result.stderr}')
+    return output_file
+
+
+# movflags for each MP4 layout: moov atom up front, or fragments playable as they arrive
+MP4_LAYOUTS = {
+    'faststart': '+faststart',
+    'fragmented': '+frag_keyframe+empty_moov+default_base_moof',
+}
+
+
+def postprocess_video(input_file, output_file, layout='faststart', preset=None, crf=None, timeout=600):
+    """Rewrite an MP4 for progressive playback.
+
+    Without preset/crf the streams are copied and only the container is
+    remuxed; with them the video is re-encoded with libx264.
+    """
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', input_file]
+    if preset or crf is not None:
+        command += ['-c:v', 'libx264', '-pix_fmt', 'yuv420p']
+        if preset:
+            command += ['-preset', preset]
+        if crf is not None:
+            command += ['-crf', str(crf)]
+        command += ['-c:a', 'copy']
+    else:
+        command += ['-c', 'copy']
+    if layout in MP4_LAYOUTS:
+        command += ['-movflags', MP4_LAYOUTS[layout]]
+    command.append(output_file)
+
+    result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f'ffmpeg post-processing failed: {result.stderr}')
+    return output_file
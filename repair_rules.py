@@ -0,0 +1,279 @@
+import os
+import re
+import time
+import sqlite3
+import difflib
+import logging
+import threading
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Rules that keep failing more often than they help are skipped
+MAX_NET_FAILURES = 3
+
+# Learned rules only come from small, local fixes
+MAX_CHANGED_LINES = 3
+MIN_FRAGMENT_CHARS = 3
+
+# Rules shipped with the app, seeded into every store
+BUILTIN_RULES = [
+    # Gemini regularly stops a long call one bracket short
+    ("SyntaxError: <str> was never closed", 'close_brackets', '', ''),
+    # Indexing into MathTex parts is fragile and forbidden by our prompt anyway
+    ("IndexError: list index out of range", 'regex', r'\b(\w+)\[\d+\](?=\.set_color\()', r'\1'),
+]
+
+
+def error_message(error_text):
+    """The final 'Type: message' line of a traceback or error string"""
+    lines = [line.strip() for line in error_text.strip().splitlines() if line.strip()]
+    for line in reversed(lines):
+        if re.match(r'^[A-Za-z_][\w.]*(Error|Exception|Warning)\b', line):
+            return line
+    return lines[-1] if lines else ''
+
+
+def error_signature(error_text):
+    """Normalise an error so recurring failures share one signature.
+
+    Quoted values become <str> and numbers <num>, e.g.
+    "NameError: name 'foo' is not defined" -> "NameError: name <str> is not defined".
+    """
+    message = error_message(error_text)
+    message = re.sub(r'\s*\(<[^>]*>, line \d+\)$', '', message)
+    message = re.sub(r"'[^']*'|\"[^\"]*\"", '<str>', message)
+    message = re.sub(r'\b\d+(\.\d+)?\b', '<num>', message)
+    return message
+
+
+def error_line(error_text):
+    """Line number of the failure in the generated scene, if the error names one"""
+    matches = re.findall(r'File "[^"]*scene\.py", line (\d+)', error_text)
+    if not matches:
+        matches = re.findall(r'line (\d+)', error_text)
+    return int(matches[-1]) if matches else None
+
+
+def close_brackets(code, lineno):
+    """Append the closing brackets a line opens but never closes"""
+    lines = code.split('\n')
+    if not lineno or lineno > len(lines):
+        return code
+    line = lines[lineno - 1]
+    missing = ''
+    for opening, closing in (('[', ']'), ('{', '}'), ('(', ')')):
+        missing += closing * max(line.count(opening) - line.count(closing), 0)
+    if not missing:
+        return code
+    lines[lineno - 1] = line + missing
+    return '\n'.join(lines)
+
+
+def _fragment_pattern(fragment):
+    """Literal regex for a fragment, anchored on word boundaries where it has them"""
+    pattern = re.escape(fragment)
+    if re.match(r'\w', fragment):
+        pattern = r'\b' + pattern
+    if re.search(r'\w$', fragment):
+        pattern += r'\b'
+    return pattern
+
+
+def diff_rewrites(old_code, new_code):
+    """Literal (old, new) fragment pairs if new_code is a small local edit of old_code"""
+    old_lines = old_code.split('\n')
+    new_lines = new_code.split('\n')
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    changes = [op for op in matcher.get_opcodes() if op[0] != 'equal']
+    if not changes:
+        return []
+
+    rewrites = []
+    changed = 0
+    for tag, old_start, old_end, new_start, new_end in changes:
+        if tag != 'replace' or old_end - old_start != new_end - new_start:
+            return []
+        changed += old_end - old_start
+        if changed > MAX_CHANGED_LINES:
+            return []
+        for old_line, new_line in zip(old_lines[old_start:old_end], new_lines[new_start:new_end]):
+            # Trim the common prefix and suffix, widened to whole identifiers
+            prefix = 0
+            while prefix < min(len(old_line), len(new_line)) and old_line[prefix] == new_line[prefix]:
+                prefix += 1
+            suffix = 0
+            while (suffix < min(len(old_line), len(new_line)) - prefix and
+                   old_line[-1 - suffix] == new_line[-1 - suffix]):
+                suffix += 1
+            while prefix and re.match(r'\w', old_line[prefix - 1]):
+                prefix -= 1
+            while suffix and re.match(r'\w', old_line[len(old_line) - suffix]):
+                suffix -= 1
+            old_fragment = old_line[prefix:len(old_line) - suffix]
+            new_fragment = new_line[prefix:len(new_line) - suffix]
+            if len(old_fragment.strip()) < MIN_FRAGMENT_CHARS:
+                return []
+            rewrites.append((old_fragment, new_fragment))
+    return rewrites
+
+
+class RepairAttempt:
+    """Code rewritten by one or more stored rules"""
+
+    def __init__(self, code, rule_ids):
+        self.code = code
+        self.rule_ids = rule_ids
+
+
+class RepairRules:
+    """Persistent map from normalised error signatures to code rewrite rules.
+
+    Rules are either built in or learned from small fixes Gemini made for the
+    same signature. Each rule tracks hits, successes and failures.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                '''CREATE TABLE IF NOT EXISTS rules (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    signature TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    pattern TEXT NOT NULL,
+                    replacement TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used REAL,
+                    UNIQUE (signature, kind, pattern, replacement)
+                )'''
+            )
+            for signature, kind, pattern, replacement in BUILTIN_RULES:
+                conn.execute(
+                    '''INSERT OR IGNORE INTO rules
+                       (signature, kind, pattern, replacement, origin, created_at)
+                       VALUES (?, ?, ?, ?, 'builtin', ?)''',
+                    (signature, kind, pattern, replacement, time.time())
+                )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def apply(self, error_text, code):
+        """Rewrite code with every active rule for this error, or return None"""
+        signature = error_signature(error_text)
+        lineno = error_line(error_text)
+        try:
+            with self._connect() as conn:
+                rules = conn.execute(
+                    '''SELECT id, kind, pattern, replacement FROM rules
+                       WHERE signature = ? AND failures - successes < ?
+                       ORDER BY successes DESC, id''',
+                    (signature, MAX_NET_FAILURES)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Repair rule lookup failed: {str(e)}")
+            rules = []
+
+        applied = []
+        for rule_id, kind, pattern, replacement in rules:
+            try:
+                if kind == 'close_brackets':
+                    rewritten = close_brackets(code, lineno)
+                else:
+                    rewritten = re.sub(pattern, replacement, code)
+            except re.error as e:
+                logger.warning(f"Skipping invalid repair rule {rule_id}: {str(e)}")
+                continue
+            if rewritten != code:
+                code = rewritten
+                applied.append(rule_id)
+
+        with self.lock:
+            self.lookups += 1
+            if applied:
+                self.hits += 1
+        if not applied:
+            return None
+
+        logger.info(f"Applied repair rules {applied} for: {signature}")
+        self._update(applied, 'hits = hits + 1, last_used = ?', (time.time(),))
+        return RepairAttempt(code, applied)
+
+    def record(self, rule_ids, success):
+        """Count whether code repaired by these rules went on to work"""
+        column = 'successes' if success else 'failures'
+        self._update(rule_ids, f'{column} = {column} + 1')
+
+    def learn(self, error_text, old_code, new_code):
+        """Store small fixes that resolved an error as rules for its signature"""
+        signature = error_signature(error_text)
+        learned = 0
+        for old_fragment, new_fragment in diff_rewrites(old_code, new_code):
+            try:
+                with self._connect() as conn:
+                    cursor = conn.execute(
+                        '''INSERT OR IGNORE INTO rules
+                           (signature, kind, pattern, replacement, origin, created_at)
+                           VALUES (?, 'regex', ?, ?, 'learned', ?)''',
+                        (signature, _fragment_pattern(old_fragment),
+                         new_fragment.replace('\\', '\\\\'), time.time())
+                    )
+                    learned += cursor.rowcount
+            except sqlite3.Error as e:
+                logger.error(f"Storing repair rule failed: {str(e)}")
+        if learned:
+            logger.info(f"Learned {learned} repair rule(s) for: {signature}")
+        return learned
+
+    def _update(self, rule_ids, assignments, params=()):
+        if not rule_ids:
+            return
+        placeholders = ', '.join('?' for _ in rule_ids)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f'UPDATE rules SET {assignments} WHERE id IN ({placeholders})',
+                    (*params, *rule_ids)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Updating repair rules failed: {str(e)}")
+
+    def stats(self, top=10):
+        """Lookup counters and the most used rules"""
+        try:
+            with self._connect() as conn:
+                total = conn.execute('SELECT COUNT(*) FROM rules').fetchone()[0]
+                rows = conn.execute(
+                    '''SELECT signature, kind, pattern, replacement, origin, hits, successes, failures
+                       FROM rules ORDER BY hits DESC, id LIMIT ?''',
+                    (top,)
+                ).fetchall()
+        except sqlite3.Error:
+            total, rows = None, []
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+            'rules': total,
+            'top_rules': [
+                dict(zip(('signature', 'kind', 'pattern', 'replacement', 'origin',
+                          'hits', 'successes', 'failures'), row))
+                for row in rows
+            ],
+        }
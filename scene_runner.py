@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import logging
+import traceback
+
+from partial_cache import partial_movie_dir
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Map our quality names onto Manim's quality presets
+MANIM_QUALITIES = {
+    'low': 'low_quality',
+    'medium': 'medium_quality',
+    'high': 'high_quality',
+}
+
+
+def load_scene_class(source, code_file, scene_name='MainScene'):
+    """Execute scene source in a fresh namespace and return the scene class"""
+    namespace = {'__name__': '__scene__', '__file__': code_file}
+    exec(compile(source, code_file, 'exec'), namespace)
+    if scene_name not in namespace:
+        raise NameError(f"Scene class {scene_name} is not defined")
+    return namespace[scene_name]
+
+
+def use_tex_template():
+    """Switch the active config to the precompiled-format tex template, if one is set up"""
+    from manim import config
+
+    template_file = os.environ.get('MANIM_TEX_TEMPLATE_FILE')
+    if template_file and os.path.exists(template_file):
+        config.tex_template_file = template_file
+
+
+def render_scene(source, code_file, media_dir, quality='medium', fmt='mp4', fps=None, on_animation=None):
+    """Render MainScene from source and return the path of the output video.
+
+    on_animation, if given, is called with a progress dict after each
+    self.play()/self.wait() finishes.
+    """
+    from manim import tempconfig
+
+    options = {
+        'media_dir': media_dir,
+        'input_file': code_file,
+        'quality': MANIM_QUALITIES[quality],
+        'format': fmt,
+        'preview': False,
+        'progress_bar': 'none',
+        # Keeps the .tex files the shared LaTeX cache counts hits from
+        'no_latex_cleanup': True,
+        # Where the shared partial movie cache seeds and collects animations
+        'partial_movie_dir': partial_movie_dir(media_dir),
+        'max_files_cached': 1000000,
+    }
+    if fps:
+        options['frame_rate'] = fps
+    with tempconfig(options):
+        use_tex_template()
+        scene_class = load_scene_class(source, code_file)
+        scene = scene_class()
+
+        if on_animation:
+            original_play = scene.play
+
+            def play(*args, **kwargs):
+                result = original_play(*args, **kwargs)
+                on_animation({
+                    'animation': scene.renderer.num_plays - 1,
+                    'description': ', '.join(str(arg) for arg in args)[:120],
+                    'percent': 100,
+                })
+                return result
+
+            scene.play = play
+
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+
+def run_render_job(source, code_file, media_dir, quality='medium', fmt='mp4', fps=None, on_animation=None):
+    """Render a scene and report the outcome as a plain, picklable dict"""
+    try:
+        path = render_scene(source, code_file, media_dir, quality, fmt, fps, on_animation)
+        if not os.path.exists(path):
+            return {'ok': False, 'error': f'Rendered video missing at {path}'}
+        return {'ok': True, 'path': path}
+    except Exception:
+        return {'ok': False, 'error': traceback.format_exc()}
+
+
+def dry_run_scene(source, code_file, media_dir):
+    """Run MainScene.construct without rasterizing or writing any frames.
+
+    Returns the number of animations played and the total scene duration.
+    """
+    from manim import tempconfig
+
+    options = {
+        'media_dir': media_dir,
+        'input_file': code_file,
+        'dry_run': True,
+        'disable_caching': True,
+        'preview': False,
+        'progress_bar': 'none',
+        # Keeps the .tex files the shared LaTeX cache counts hits from
+        'no_latex_cleanup': True,
+    }
+    with tempconfig(options):
+        use_tex_template()
+        scene_class = load_scene_class(source, code_file)
+        scene = scene_class()
+        scene.render()
+        return scene.renderer.num_plays, scene.renderer.time
+
+
+def run_dry_run_job(source, code_file, media_dir):
+    """Dry-run a scene and report the outcome as a plain, picklable dict"""
+    try:
+        animations, duration = dry_run_scene(source, code_file, media_dir)
+        return {'ok': True, 'animations': animations, 'duration': duration}
+    except Exception:
+        return {'ok': False, 'error': traceback.format_exc()}
+
+
+if __name__ == '__main__':
+    # Used for dry runs in a fresh interpreter: scene_runner.py CODE_FILE MEDIA_DIR
+    code_file, media_dir = sys.argv[1], sys.argv[2]
+    with open(code_file, 'r', encoding='utf-8') as f:
+        result = run_dry_run_job(f.read(), code_file, media_dir)
+    # The result is the last line of output, after anything the scene printed
+    print(json.dumps(result))
@@ -10,6 +10,8 @@ import time
 import os
 from datetime import datetime
 
+from docs_index import build_index_file
+
 def scrape_page(url):
     """Scrape content from a single page"""
     try:
@@ -124,6 +126,11 @@ SOURCE: {url}
         print(f"📝 Total content: {total_chars:,} characters")
         print(f"📄 URLs processed: {len(urls)}")
         
+        # Rebuild the memory-mapped search index the app serves from
+        index_file = os.path.splitext(output_file)[0] + '.idx'
+        build_index_file(output_file, index_file)
+        print(f"🔎 Search index saved to: {index_file}")
+        
     except Exception as e:
         print(f"❌ Error saving file: {str(e)}")
 
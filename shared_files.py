@@ -0,0 +1,172 @@
+import os
+import glob
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def link_file(path, target):
+    """Hard link path to target, falling back to a symlink across filesystems.
+
+    Returns False if neither could be created.
+    """
+    try:
+        os.link(path, target)
+        return True
+    except FileExistsError:
+        return True
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(path), target)
+        return True
+    except FileExistsError:
+        return True
+    except OSError as e:
+        logger.warning(f"Could not link {os.path.basename(path)}: {str(e)}")
+        return False
+
+
+def publish_file(source, path):
+    """Copy a finished file into a shared directory with an atomic rename.
+
+    Returns False if another writer got there first or the copy failed.
+    """
+    if os.path.exists(path):
+        return False
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not publish {os.path.basename(path)}: {str(e)}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+def touch(path):
+    """Mark a shared file as recently used"""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def evict_lru(pattern, max_bytes):
+    """Delete the least recently modified files matching pattern beyond max_bytes.
+
+    Returns the number of files removed.
+    """
+    entries = []
+    total = 0
+    for path in glob.glob(pattern):
+        if path.endswith('.tmp'):
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    removed = 0
+    for mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not evict {path}: {str(e)}")
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def usage(pattern):
+    """(file count, total bytes) of the files matching pattern"""
+    count = 0
+    size = 0
+    for path in glob.glob(pattern):
+        if path.endswith('.tmp'):
+            continue
+        try:
+            size += os.path.getsize(path)
+            count += 1
+        except OSError:
+            continue
+    return count, size
+
+
+def scene_key(code):
+    """Key for the renders of one scene source"""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()[:32]
+
+
+class SeedIndex:
+    """Which shared files are worth linking into a job before it renders.
+
+    Linking a whole shared directory into every job costs time in
+    proportion to the cache. Instead a job gets the files earlier renders
+    of the same scene used, plus the most recently used files overall,
+    which cover what different scenes share (title cards, axes, common
+    formulas). Both sets are bounded, so seeding does not grow with the
+    cache. The recent set starts from one scan of the shared directory.
+    """
+
+    def __init__(self, pattern, max_recent=500, max_scenes=1000):
+        self.pattern = pattern
+        self.max_recent = max_recent
+        self.max_scenes = max_scenes
+        self.recent = None
+        self.scenes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _warm(self):
+        entries = []
+        for path in glob.glob(self.pattern):
+            if path.endswith('.tmp'):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), os.path.basename(path)))
+            except OSError:
+                continue
+        entries.sort()
+        self.recent = OrderedDict((name, None) for _, name in entries[-self.max_recent:])
+
+    def names(self, key):
+        """Names to seed for a render of the scene with this key"""
+        with self.lock:
+            if self.recent is None:
+                self._warm()
+            names = set(self.recent)
+            names.update(self.scenes.get(key, ()))
+        return names
+
+    def record(self, key, names):
+        """Remember the shared files a render of this scene used"""
+        if not names:
+            return
+        with self.lock:
+            if self.recent is None:
+                self._warm()
+            used = self.scenes.setdefault(key, set())
+            used.update(names)
+            self.scenes.move_to_end(key)
+            while len(self.scenes) > self.max_scenes:
+                self.scenes.popitem(last=False)
+            for name in names:
+                self.recent[name] = None
+                self.recent.move_to_end(name)
+            while len(self.recent) > self.max_recent:
+                self.recent.popitem(last=False)
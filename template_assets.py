@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def manim_version():
+    """Installed Manim version, part of every asset's identity"""
+    try:
+        from importlib.metadata import version
+        return version('manim')
+    except Exception:
+        return 'unknown'
+
+
+class TemplateAssetStore:
+    """Versioned store of pre-rendered template videos.
+
+    Asset file names include a hash of the generator's code, the quality and
+    the Manim version, so editing a template only invalidates that template.
+    `signature(quality)` adds settings that change the rendered bytes, such
+    as post-processing, to the hash.
+    """
+
+    def __init__(self, asset_dir, signature=None):
+        self.asset_dir = asset_dir
+        self.signature = signature
+        self.manifest_path = os.path.join(asset_dir, 'manifest.json')
+        self.version = manim_version()
+        self.lock = threading.Lock()
+        os.makedirs(asset_dir, exist_ok=True)
+
+    def code_hash(self, code, quality, fmt='mp4'):
+        digest = hashlib.sha256()
+        signature = self.signature(quality) if self.signature else ''
+        digest.update(f'{self.version}\0{quality}\0{fmt}\0{signature}\0'.encode('utf-8'))
+        digest.update(code.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def filename(self, name, code, quality, fmt='mp4'):
+        return f'{name}-{quality}-{self.code_hash(code, quality, fmt)}.{fmt}'
+
+    def path(self, name, code, quality, fmt='mp4'):
+        return os.path.join(self.asset_dir, self.filename(name, code, quality, fmt))
+
+    def lookup(self, name, code, quality, fmt='mp4'):
+        """Return the pre-rendered video for this exact template code, or None"""
+        path = self.path(name, code, quality, fmt)
+        return path if os.path.exists(path) else None
+
+    def store(self, name, code, quality, source_path, fmt='mp4'):
+        """Move a rendered template into the store and record it in the manifest"""
+        path = self.path(name, code, quality, fmt)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        shutil.move(source_path, temp_path)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            manifest = self.load_manifest()
+            manifest['manim_version'] = self.version
+            entry = manifest['templates'].setdefault(name, {})
+            entry[quality] = {
+                'file': os.path.basename(path),
+                'hash': self.code_hash(code, quality, fmt),
+                'rendered_at': time.time(),
+            }
+            self._write_manifest(manifest)
+        return path
+
+    def prune(self, keep):
+        """Delete asset files that are no longer referenced by any template"""
+        keep = {os.path.basename(path) for path in keep}
+        removed = 0
+        for filename in os.listdir(self.asset_dir):
+            if filename == 'manifest.json' or filename in keep or filename.endswith('.tmp'):
+                continue
+            os.remove(os.path.join(self.asset_dir, filename))
+            removed += 1
+            logger.info(f"Removed stale template asset {filename}")
+
+        with self.lock:
+            manifest = self.load_manifest()
+            for name in list(manifest['templates']):
+                qualities = manifest['templates'][name]
+                for quality in list(qualities):
+                    if qualities[quality]['file'] not in keep:
+                        del qualities[quality]
+                if not qualities:
+                    del manifest['templates'][name]
+            self._write_manifest(manifest)
+        return removed
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'manim_version': self.version, 'templates': {}}
+
+    def _write_manifest(self, manifest):
+        temp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""Test job queue bookkeeping around finished jobs"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from job_queue import JobQueue, Job
+
+
+def test_prune_during_finish():
+    """_prune must not fail on a job that reads as finished before finished_at is set"""
+    print("Testing job pruning while a job finishes...")
+    print("=" * 60)
+    passed = True
+
+    queue = JobQueue(max_workers=1, retention=60)
+
+    # A job caught between its terminal status and its finish time
+    finishing = Job('finishing')
+    finishing.status = 'succeeded'
+    queue.jobs[finishing.id] = finishing
+    # A job that finished long ago and should be forgotten
+    expired = Job('expired')
+    expired.status = 'failed'
+    expired.finished_at = time.time() - 3600
+    queue.jobs[expired.id] = expired
+
+    try:
+        with queue.lock:
+            queue._prune()
+    except TypeError as e:
+        print(f"❌ _prune raised on a finishing job: {e}")
+        passed = False
+    else:
+        if finishing.id in queue.jobs and expired.id not in queue.jobs:
+            print("✅ Finishing job kept, expired job pruned: PASSED")
+        else:
+            print(f"❌ Unexpected jobs after pruning: {list(queue.jobs)}")
+            passed = False
+
+    # A finished job always carries its finish time
+    release = threading.Event()
+
+    def work(job):
+        release.wait()
+        return {'success': True}
+
+    job = queue.submit(work, 'concept')
+    release.set()
+    deadline = time.monotonic() + 5
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.001)
+    if job.finished and job.finished_at is not None:
+        print("✅ Job finished with finished_at set: PASSED")
+    else:
+        print(f"❌ Job status {job.status}, finished_at {job.finished_at}")
+        passed = False
+
+    print("=" * 60)
+    print("🎉 All job queue checks passed" if passed else "⚠️ Some job queue checks failed")
+    return passed
+
+
+if __name__ == "__main__":
+    success = test_prune_during_finish()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+"""Test the Gemini gateway against a local fake Gemini server"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from google import genai
+from google.genai import types
+from llm_gateway import LLMGateway, LLMUnavailableError, CircuitOpenError
+
+# Status codes the fake server answers with, in order; 200 once exhausted
+responses = []
+requests_seen = 0
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    def do_POST(self):
+        global requests_seen
+        requests_seen += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status = responses.pop(0) if responses else 200
+
+        if status == 200:
+            body = {
+                'candidates': [{
+                    'content': {'role': 'model', 'parts': [{'text': 'from manim import *'}]},
+                    'finishReason': 'STOP',
+                }]
+            }
+        else:
+            body = {'error': {'code': status, 'message': 'fake failure', 'status': 'UNAVAILABLE'}}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_gateway(base_url, **options):
+    client = genai.Client(api_key='test-key', http_options=types.HttpOptions(base_url=base_url, timeout=5000))
+    return LLMGateway(client, base_delay=0.05, max_delay=0.2, **options)
+
+
+def call(gateway):
+    return gateway.generate_content(model='gemini-2.5-flash-lite', contents='test')
+
+
+def test_llm_gateway():
+    """Check success, retries on 503 and the circuit breaker on persistent 500s"""
+    global requests_seen
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f"Fake Gemini server on {base_url}")
+    print("=" * 60)
+
+    passed = True
+    try:
+        gateway = make_gateway(base_url)
+        response = call(gateway)
+        if response.text == 'from manim import *':
+            print("✅ Plain call: PASSED")
+        else:
+            print(f"❌ Plain call: unexpected text {response.text!r}")
+            passed = False
+
+        responses[:] = [503, 503]
+        requests_seen = 0
+        response = call(gateway)
+        stats = gateway.stats()
+        if response.text and requests_seen == 3 and stats['retries'] == 2:
+            print("✅ Retry after 503: PASSED")
+        else:
+            print(f"❌ Retry after 503: {requests_seen} requests, stats {stats}")
+            passed = False
+
+        gateway = make_gateway(base_url, max_retries=1, breaker_threshold=2, breaker_reset=60)
+        responses[:] = [500] * 10
+        requests_seen = 0
+        try:
+            call(gateway)
+            print("❌ Persistent 500: call unexpectedly succeeded")
+            passed = False
+        except CircuitOpenError:
+            print("❌ Persistent 500: breaker opened before any failure")
+            passed = False
+        except LLMUnavailableError as e:
+            if requests_seen == 2 and e.__cause__ is not None:
+                print(f"✅ Persistent 500 gives up with LLMUnavailableError after {requests_seen} requests: PASSED")
+            else:
+                print(f"❌ Persistent 500: {requests_seen} requests, cause {e.__cause__!r}")
+                passed = False
+
+        start = time.monotonic()
+        try:
+            call(gateway)
+            print("❌ Open breaker: call unexpectedly went through")
+            passed = False
+        except CircuitOpenError:
+            elapsed = time.monotonic() - start
+            if requests_seen == 2 and elapsed < 0.1:
+                print(f"✅ Open breaker fails fast ({elapsed * 1000:.1f} ms): PASSED")
+            else:
+                print(f"❌ Open breaker: {requests_seen} requests, {elapsed:.2f}s")
+                passed = False
+        print(f"Gateway stats: {gateway.stats()}")
+    finally:
+        server.shutdown()
+
+    print("=" * 60)
+    print("🎉 All gateway checks passed" if passed else "⚠️ Some gateway checks failed")
+    return passed
+
+
+if __name__ == "__main__":
+    success = test_llm_gateway()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+import os
+import glob
+import logging
+import threading
+from contextlib import contextmanager
+
+from shared_files import SeedIndex, link_file, publish_file, touch, evict_lru, usage
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Manim's default tex_dir is {media_dir}/Tex
+TEX_SUBDIR = 'Tex'
+
+
+class TexCache:
+    """LaTeX SVGs shared by every render job.
+
+    Manim names each compiled formula {hash}.svg, where the hash covers the
+    expression and the TeX template, and skips LaTeX when that file already
+    exists in its tex_dir. Jobs keep their private tex_dir: attach() links
+    the cached SVGs into it before the render and publishes newly compiled
+    ones afterwards with an atomic rename, so concurrent jobs and workers
+    never see a half-written file. Only the formulas a SeedIndex picks for
+    the scene are linked, so seeding stays cheap as the cache grows.
+
+    Hits and misses are counted from the .tex files Manim writes for every
+    formula it needs, which requires rendering with --no_latex_cleanup.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 ** 2, max_recent=500):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index = SeedIndex(os.path.join(cache_dir, '*.svg'), max_recent)
+        self.hits = 0
+        self.misses = 0
+        self.published = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def tex_dir(self, media_dir):
+        return os.path.join(media_dir, TEX_SUBDIR)
+
+    @contextmanager
+    def attach(self, media_dir, key):
+        """Seed a job's tex_dir for the scene with this key and publish what the job compiled"""
+        seeded = self.seed(media_dir, key)
+        try:
+            yield
+        finally:
+            self.publish(media_dir, key, seeded)
+
+    def seed(self, media_dir, key):
+        """Link the SVGs the scene is likely to need into the job's tex_dir; returns the seeded names"""
+        tex_dir = self.tex_dir(media_dir)
+        os.makedirs(tex_dir, exist_ok=True)
+        seeded = set()
+        for name in self.index.names(key):
+            path = os.path.join(self.cache_dir, name)
+            # Evicted since it was last used
+            if os.path.exists(path) and link_file(path, os.path.join(tex_dir, name)):
+                seeded.add(name)
+        return seeded
+
+    def publish(self, media_dir, key, seeded):
+        """Copy SVGs compiled by the job into the cache and count hits and misses"""
+        tex_dir = self.tex_dir(media_dir)
+        hits = 0
+        misses = 0
+        published = 0
+        used = []
+        for tex_file in glob.glob(os.path.join(tex_dir, '*.tex')):
+            name = os.path.splitext(os.path.basename(tex_file))[0] + '.svg'
+            used.append(name)
+            if name in seeded:
+                hits += 1
+                # Keep formulas in use away from eviction
+                touch(os.path.join(self.cache_dir, name))
+                continue
+
+            misses += 1
+            svg_file = os.path.join(tex_dir, name)
+            # LaTeX may have failed, leaving no SVG
+            if os.path.exists(svg_file) and publish_file(svg_file, os.path.join(self.cache_dir, name)):
+                published += 1
+
+        self.index.record(key, used)
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+            self.published += published
+        if published:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used SVGs until the cache fits max_bytes"""
+        removed = evict_lru(os.path.join(self.cache_dir, '*.svg'), self.max_bytes)
+        with self.lock:
+            self.evictions += removed
+
+    def stats(self):
+        """Hit/miss counters and current directory usage"""
+        count, size = usage(os.path.join(self.cache_dir, '*.svg'))
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'published': self.published,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'formulas': count,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Precompiled LaTeX format for Manim's tex template.
+
+Every MathTex/Tex compilation normally starts LaTeX cold and loads the
+template's class and packages again. This module dumps that preamble once
+into a .fmt file and writes a matching Manim tex template whose first line,
+"%&<format>", makes latex load the dump instead. The format name contains
+a hash of the preamble and the latex version, so a changed template or
+TeX installation gets a fresh format rather than a stale one.
+
+Build it at image build time with: python tex_format.py [FORMAT_DIR]
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import subprocess
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Manim replaces this with each formula
+PLACEHOLDER = 'YourTextHere'
+
+# Formula compiled to check that a new format actually works
+PROBE_FORMULA = r'\begin{align*} e^{i\pi} + 1 = 0 \end{align*}'
+
+BUILD_TIMEOUT = 120
+
+
+class TexFormatError(Exception):
+    """Raised when the format cannot be built or fails verification"""
+
+
+def latex_version(compiler='latex'):
+    """First line of `latex --version`, or None when LaTeX is not installed"""
+    if not shutil.which(compiler):
+        return None
+    try:
+        result = subprocess.run([compiler, '--version'], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    lines = result.stdout.strip().splitlines()
+    return lines[0] if lines else None
+
+
+class TexFormat:
+    """A dumped LaTeX preamble plus the Manim template that uses it"""
+
+    def __init__(self, fmt_dir, documentclass, preamble, compiler='latex'):
+        self.fmt_dir = fmt_dir
+        self.documentclass = documentclass
+        self.preamble = preamble
+        self.compiler = compiler
+        self.version = latex_version(compiler)
+        digest = hashlib.sha256(
+            f'{documentclass}\0{preamble}\0{compiler}\0{self.version}'.encode('utf-8')
+        ).hexdigest()
+        self.digest = digest
+        self.name = f'manim_preamble_{digest[:12]}'
+
+    @classmethod
+    def from_manim_config(cls, fmt_dir):
+        """Format for the tex template Manim is currently configured with"""
+        from manim import config
+
+        template = config.tex_template
+        if template.tex_compiler != 'latex' or template.output_format != '.dvi':
+            raise TexFormatError(
+                f'Only latex with dvi output is supported, not {template.tex_compiler} '
+                f'with {template.output_format}'
+            )
+        return cls(fmt_dir, template.documentclass, template.preamble, template.tex_compiler)
+
+    @property
+    def fmt_file(self):
+        return os.path.join(self.fmt_dir, f'{self.name}.fmt')
+
+    @property
+    def template_file(self):
+        return os.path.join(self.fmt_dir, f'{self.name}.tex')
+
+    @property
+    def manifest_file(self):
+        return os.path.join(self.fmt_dir, f'{self.name}.json')
+
+    def template_source(self):
+        """Manim tex template that loads the format instead of the preamble"""
+        return (
+            f'%&{self.name}\n'
+            '\\begin{document}\n'
+            '\n'
+            f'{PLACEHOLDER}\n'
+            '\n'
+            '\\end{document}\n'
+        )
+
+    def env(self):
+        """Environment so latex finds the format; the trailing separator keeps the default paths"""
+        return {'TEXFORMATS': os.path.abspath(self.fmt_dir) + os.pathsep}
+
+    def in_sync(self):
+        """True if a verified format for the current template and latex exists"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (manifest.get('digest') == self.digest and
+                os.path.exists(self.fmt_file) and os.path.exists(self.template_file))
+
+    def ensure(self):
+        """Build and verify the format unless an up-to-date one exists"""
+        if self.in_sync():
+            return self
+        self.build()
+        return self
+
+    def build(self):
+        if self.version is None:
+            raise TexFormatError(f'{self.compiler} is not installed')
+        os.makedirs(self.fmt_dir, exist_ok=True)
+        logger.info(f"Building LaTeX format {self.name}")
+
+        work_dir = tempfile.mkdtemp(prefix='texfmt_', dir=self.fmt_dir)
+        try:
+            ini_file = os.path.join(work_dir, f'{self.name}.ini.tex')
+            with open(ini_file, 'w', encoding='utf-8') as f:
+                f.write(f'{self.documentclass}\n{self.preamble}\n\\dump\n')
+            result = subprocess.run(
+                [self.compiler, '-ini', f'-jobname={self.name}', '-interaction=batchmode',
+                 '-halt-on-error', '&latex', ini_file],
+                cwd=work_dir, capture_output=True, text=True, timeout=BUILD_TIMEOUT
+            )
+            built = os.path.join(work_dir, f'{self.name}.fmt')
+            if result.returncode != 0 or not os.path.exists(built):
+                raise TexFormatError(f'Dumping the preamble failed: {self._log_tail(work_dir)}')
+
+            template_file = os.path.join(work_dir, f'{self.name}.tex')
+            with open(template_file, 'w', encoding='utf-8') as f:
+                f.write(self.template_source())
+            self._verify(work_dir)
+
+            # Publish atomically so concurrent workers never load a partial format
+            os.replace(built, self.fmt_file)
+            os.replace(template_file, self.template_file)
+            with open(os.path.join(work_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({'digest': self.digest, 'latex': self.version,
+                           'documentclass': self.documentclass, 'preamble': self.preamble}, f, indent=2)
+            os.replace(os.path.join(work_dir, 'manifest.json'), self.manifest_file)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise TexFormatError(f'Building the LaTeX format failed: {str(e)}')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.prune()
+        logger.info(f"LaTeX format ready: {self.fmt_file}")
+
+    def _verify(self, work_dir):
+        """Compile a probe formula with the new format to DVI"""
+        probe_file = os.path.join(work_dir, 'probe.tex')
+        with open(probe_file, 'w', encoding='utf-8') as f:
+            f.write(self.template_source().replace(PLACEHOLDER, PROBE_FORMULA))
+        env = dict(os.environ, TEXFORMATS=os.path.abspath(work_dir) + os.pathsep)
+        result = subprocess.run(
+            [self.compiler, '-interaction=batchmode', '-halt-on-error', 'probe.tex'],
+            cwd=work_dir, env=env, capture_output=True, text=True, timeout=BUILD_TIMEOUT
+        )
+        if result.returncode != 0 or not os.path.exists(os.path.join(work_dir, 'probe.dvi')):
+            raise TexFormatError(f'Probe formula failed with the new format: {self._log_tail(work_dir, "probe")}')
+
+    def _log_tail(self, work_dir, jobname=None):
+        log_file = os.path.join(work_dir, f'{jobname or self.name}.log')
+        try:
+            with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()[-1500:]
+        except OSError:
+            return 'no log written'
+
+    def prune(self):
+        """Remove formats built for earlier templates or LaTeX versions"""
+        for name in os.listdir(self.fmt_dir):
+            if name.startswith('manim_preamble_') and not name.startswith(self.name + '.'):
+                try:
+                    os.remove(os.path.join(self.fmt_dir, name))
+                except OSError:
+                    pass
+
+    def activate(self):
+        """Point this process and its child processes at the format"""
+        os.environ.update(self.env())
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'in_sync': self.in_sync(),
+            'latex': self.version,
+            'template_file': self.template_file,
+        }
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    fmt_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'texfmt')
+    try:
+        tex_format = TexFormat.from_manim_config(fmt_dir).ensure()
+    except TexFormatError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ {tex_format.fmt_file}")
@@ -0,0 +1,87 @@
+import os
+import re
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Cached renders (render_<hash>.mp4) and template assets (<name>-<quality>-<hash>.mp4)
+# never change under the same name
+CONTENT_ADDRESSED = re.compile(r'(^|/)(render_[0-9a-f]{32}|[\w-]+-[0-9a-f]{16})(/|\.)')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Other files may be replaced in place, so browsers revalidate with the ETag
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+OFFLOAD_MODES = ('', 'x-accel', 'x-sendfile')
+
+# Containers mimetypes does not know everywhere
+VIDEO_MIMETYPES = {
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+    '.mov': 'video/quicktime',
+    '.gif': 'image/gif',
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+
+
+def is_content_addressed(filename):
+    return CONTENT_ADDRESSED.search(filename) is not None
+
+
+def cache_control_for(filename):
+    return IMMUTABLE_CACHE_CONTROL if is_content_addressed(filename) else REVALIDATE_CACHE_CONTROL
+
+
+def video_mimetype(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in VIDEO_MIMETYPES:
+        return VIDEO_MIMETYPES[extension]
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+class ContentEtags:
+    """Strong ETags from file contents, hashed once per file version.
+
+    Content-addressed files already carry their hash in the name, which is
+    used as the tag directly. Other entries are keyed on path, size and
+    modification time, so a file that is replaced gets a new tag without
+    any explicit invalidation.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path, stat=None):
+        # Only the file's own name counts: segments inside a content-addressed
+        # directory are distinct files and still need their own tags
+        filename = os.path.basename(path)
+        if CONTENT_ADDRESSED.match(filename):
+            return filename
+
+        stat = stat or os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            etag = self.entries.get(key)
+            if etag is not None:
+                self.entries.move_to_end(key)
+                return etag
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        etag = digest.hexdigest()[:32]
+
+        with self.lock:
+            self.entries[key] = etag
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return etag